@@ -0,0 +1,96 @@
+"""A BK-tree: a metric tree for finding words within an edit distance."""
+
+
+def edit_distance(first, second):
+    """Returns the Damerau-Levenshtein distance between two strings.
+
+    Insertions, deletions, substitutions and transpositions of two
+    adjacent characters cost one edit each, and a transposed pair may be
+    edited further. Unlike the restricted (optimal string alignment)
+    variant this is a metric, which BKTree relies on.
+    """
+    infinity = len(first) + len(second)
+    # rows[i + 1][j + 1] is the distance between first[:i] and second[:j];
+    # row and column 0 hold infinity so that transpositions reaching
+    # before the start are never chosen.
+    rows = [[infinity] * (len(second) + 2)]
+    rows += [[infinity] + list(range(len(second) + 1))]
+    for i in range(1, len(first) + 1):
+        rows.append([infinity, i] + [0] * len(second))
+    # character -> last row of first holding it
+    last_row = {}
+    for i, first_char in enumerate(first, 1):
+        # last column of second matching first_char in this row
+        last_column = 0
+        for j, second_char in enumerate(second, 1):
+            swap_row = last_row.get(second_char, 0)
+            swap_column = last_column
+            if first_char == second_char:
+                cost = 0
+                last_column = j
+            else:
+                cost = 1
+            rows[i + 1][j + 1] = min(
+                rows[i][j] + cost,
+                rows[i + 1][j] + 1,
+                rows[i][j + 1] + 1,
+                # transpose, with what lies between deleted or inserted
+                rows[swap_row][swap_column]
+                + (i - swap_row - 1) + 1 + (j - swap_column - 1),
+            )
+        last_row[first_char] = i
+    return rows[-1][-1]
+
+
+class BKTree:
+    """A set of words searchable by edit distance.
+
+    Every child of a node sits at a known distance from it, so by the
+    triangle inequality a search only descends into the children whose
+    distance is within max_distance of the query's distance to the node,
+    and visits a small part of the tree for small max_distance.
+    """
+
+    def __init__(self, words=()):
+        """Builds a tree holding words."""
+        # A node is [word, {distance: child node}].
+        self._root = None
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, word):
+        """Adds word to the tree, if it is not there yet."""
+        if self._root is None:
+            self._root = [word, {}]
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """Returns a list of (distance, word) for the words within
+        max_distance of word, in no particular order."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = edit_distance(word, node_word)
+            if distance <= max_distance:
+                found.append((distance, node_word))
+            for child_distance, child in children.items():
+                if abs(child_distance - distance) <= max_distance:
+                    stack.append(child)
+        return found
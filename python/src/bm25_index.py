@@ -0,0 +1,88 @@
+"""Relevance ranking of videos with Okapi BM25."""
+
+from array import array
+from collections import Counter
+import heapq
+import math
+
+from .fuzzy_index import words_of
+
+
+# Term frequency saturation and document length normalization.
+K1 = 1.2
+B = 0.75
+
+
+class Bm25Index:
+    """Scores videos against a query by BM25 over their title and tag words.
+
+    Term statistics are computed once. Each word's postings are two
+    parallel arrays, of document numbers and of how often the word occurs
+    in them, and document lengths and handles are arrays too, so the index
+    holds no per-posting Python objects. A search only touches the
+    postings of the query words and keeps the best k scores with a heap.
+    """
+
+    def __init__(self, records):
+        """Builds the index.
+
+        Args:
+            records: An iterable of (handle, title, tags) tuples.
+        """
+        self._handles = array("q")
+        self._lengths = array("I")
+        # word -> (document numbers, term frequencies)
+        self._postings = {}
+        for handle, title, tags in records:
+            words = words_of(title)
+            for tag in tags:
+                words.extend(words_of(tag))
+            document = len(self._handles)
+            self._handles.append(handle)
+            self._lengths.append(len(words))
+            for word, frequency in Counter(words).items():
+                documents, frequencies = self._postings.setdefault(
+                    word, (array("I"), array("I")))
+                documents.append(document)
+                frequencies.append(frequency)
+        self._average_length = (
+            sum(self._lengths) / len(self._lengths) if self._lengths else 0.0)
+
+    def _idf(self, document_frequency):
+        count = len(self._handles)
+        return math.log(
+            1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def search(self, text, k, accept=None):
+        """Returns the k best matches of text.
+
+        Args:
+            text: The query; its distinct words are scored.
+            k: The number of matches wanted.
+            accept: A function of a handle telling whether it may be
+                returned, e.g. to leave out flagged videos; None accepts
+                every handle.
+
+        Returns:
+            A list of (score, handle) for the best scoring videos using at
+            least one query word, best first, ties by handle.
+        """
+        scores = {}
+        for word in set(words_of(text)):
+            postings = self._postings.get(word)
+            if postings is None:
+                continue
+            documents, frequencies = postings
+            idf = self._idf(len(documents))
+            for document, frequency in zip(documents, frequencies):
+                norm = K1 * (1 - B + B * self._lengths[document] / self._average_length)
+                scores[document] = scores.get(document, 0.0) + (
+                    idf * frequency * (K1 + 1) / (frequency + norm))
+
+        matches = (
+            (score, self._handles[document]) for document, score in scores.items()
+        )
+        if accept is not None:
+            matches = ((score, handle) for score, handle in matches if accept(handle))
+        best = heapq.nsmallest(k, ((-score, handle) for score, handle in matches))
+        return [(-negated, handle) for negated, handle in best]
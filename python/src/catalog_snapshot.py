@@ -0,0 +1,106 @@
+"""Snapshots of a parsed and indexed text catalog.
+
+A snapshot is written next to the catalog it was built from, as
+``<catalog>.snapshot``. It records the catalog's size, modification time
+and SHA-256 digest; it is only used while the catalog still has the same
+size and either the same modification time or the same digest.
+
+The file starts with a one-line JSON header holding that metadata,
+followed by the pickled state. The header is checked first, so the state
+of a stale or foreign snapshot is never unpickled.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+
+# Bumped whenever the layout of the pickled state changes.
+SNAPSHOT_VERSION = 5
+
+# Longest header line read; anything longer is not a snapshot.
+_MAX_HEADER_SIZE = 4096
+
+
+def snapshot_path(catalog_path):
+    """Returns where the snapshot of catalog_path is kept."""
+    catalog_path = Path(catalog_path)
+    return catalog_path.with_name(catalog_path.name + ".snapshot")
+
+
+def _digest(path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as catalog_file:
+        for block in iter(lambda: catalog_file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_snapshot(catalog_path, variant):
+    """Loads the snapshot of a catalog if it is still valid.
+
+    Args:
+        catalog_path: Path of the text catalog.
+        variant: Identifies how the state was built, e.g. the storage engine
+            name; a snapshot built another way is not used.
+
+    Returns:
+        The pickled state, or None if there is no usable snapshot. A missing,
+        stale or corrupt snapshot all count as unusable.
+    """
+    try:
+        with open(snapshot_path(catalog_path), "rb") as snapshot_file:
+            header = json.loads(snapshot_file.readline(_MAX_HEADER_SIZE))
+            stat = os.stat(catalog_path)
+            if (header["version"] != SNAPSHOT_VERSION
+                    or header["variant"] != variant
+                    or header["size"] != stat.st_size):
+                return None
+            if (header["mtime"] != stat.st_mtime_ns
+                    and header["digest"] != _digest(catalog_path)):
+                return None
+            return pickle.load(snapshot_file)
+    except Exception:
+        # Whatever is wrong with the snapshot, parsing the catalog again
+        # gives the right answer.
+        return None
+
+
+def write_snapshot(catalog_path, variant, state):
+    """Writes the snapshot of a catalog.
+
+    The file is written under a temporary name and moved into place, so a
+    reader never sees a partial snapshot. Failing to write it (e.g. in a
+    read-only directory) is not an error.
+
+    Args:
+        catalog_path: Path of the text catalog the state was built from.
+        variant: Identifies how the state was built.
+        state: The picklable state to store.
+    """
+    target = snapshot_path(catalog_path)
+    try:
+        stat = os.stat(catalog_path)
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "variant": variant,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "digest": _digest(catalog_path),
+        }
+        descriptor, temporary = tempfile.mkstemp(
+            dir=target.parent, prefix=target.name, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as snapshot_file:
+                snapshot_file.write(json.dumps(header).encode() + b"\n")
+                pickle.dump(state, snapshot_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, target)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    except OSError:
+        pass
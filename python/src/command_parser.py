@@ -1,163 +1,324 @@
 """A command parser class."""
 
-import textwrap
 from typing import Sequence
 
+from .prefix_trie import MAX_COMPLETIONS
+
 
 class CommandException(Exception):
     """A class used to represent a wrong command exception."""
     pass
 
 
-class CommandParser:
-    """A class used to parse and execute a user Command."""
+class Command:
+    """A command the parser can run, and how it is called.
 
-    def __init__(self, video_player):
-        self._player = video_player
+    Attributes:
+        name: The command name, upper case.
+        description: What the command does, for the help text.
+        arguments: The arguments as shown in the help text, e.g.
+            "<playlist_name> <video_id>".
+        min_args: The fewest arguments the command takes.
+        max_args: The most arguments it takes, None for no limit.
+        numeric: Positions of the arguments that must be numbers; they
+            are passed on as ints.
+        error: The message raised when the arguments do not fit.
+    """
 
-    def execute_command(self, command: Sequence[str]):
-        """Executes the user command. Expects the command to be upper case.
-           Raises CommandException if a command cannot be parsed.
-        """
-        if not command:
-            raise CommandException(
-                "Please enter a valid command, "
-                "type HELP for a list of available commands.")
+    def __init__(self, name, run, description, arguments="", min_args=0,
+                 max_args=0, numeric=(), error=None):
+        """Declares a command.
 
-        if command[0].upper() == "NUMBER_OF_VIDEOS":
-            self._player.number_of_videos()
+        Args:
+            name: The command name, upper case.
+            run: Called with the list of arguments to run the command; it
+                may raise CommandException.
+            description: See the class attributes; so are the others.
+        """
+        self.name = name
+        self._run = run
+        self.description = description
+        self.arguments = arguments
+        self.min_args = min_args
+        self.max_args = max_args
+        self.numeric = numeric
+        self.error = error
 
-        elif command[0].upper() == "SHOW_ALL_VIDEOS":
-            self._player.show_all_videos()
+    def usage(self):
+        """Returns the help text line of the command."""
+        if self.arguments:
+            return "{} {} - {}".format(self.name, self.arguments, self.description)
+        return "{} - {}".format(self.name, self.description)
 
-        elif command[0].upper() == "PLAY":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter PLAY command followed by video_id.")
-            self._player.play_video(command[1])
+    def __call__(self, arguments):
+        """Checks the arguments and runs the command with them."""
+        if (len(arguments) < self.min_args
+                or (self.max_args is not None and len(arguments) > self.max_args)
+                or any(not arguments[position].isdecimal()
+                       for position in self.numeric
+                       if position < len(arguments))):
+            raise CommandException(self.error)
+        arguments = list(arguments)
+        for position in self.numeric:
+            if position < len(arguments):
+                arguments[position] = int(arguments[position])
+        self._run(arguments)
 
-        elif command[0].upper() == "PLAY_RANDOM":
-            self._player.play_random_video()
 
-        elif command[0].upper() == "STOP":
-            self._player.stop_video()
+class CommandParser:
+    """A class used to parse and execute a user Command.
 
-        elif command[0].upper() == "PAUSE":
-            self._player.pause_video()
+    Commands are looked up by name in a registry; register adds more.
+    """
 
-        elif command[0].upper() == "CONTINUE":
-            self._player.continue_video()
+    def __init__(self, video_player, prompt=True):
+        """The CommandParser class is initialized.
 
-        elif command[0].upper() == "SHOW_PLAYING":
-            self._player.show_playing()
+        Args:
+            video_player: The VideoPlayer running the commands.
+            prompt: Whether searches may ask which result to play; False
+                behaves as if every search had --no-prompt.
+        """
+        self._player = video_player
+        self._prompt = prompt
+        # upper case command name -> Command, in help text order
+        self._commands = {}
+        self._register_player_commands()
 
-        elif command[0].upper() == "CREATE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CREATE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.create_playlist(command[1])
+    def register(self, command):
+        """Adds a Command, replacing any command with the same name."""
+        self._commands[command.name] = command
 
-        elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
+    def execute_command(self, command: Sequence[str]):
+        """Executes the user command. Expects the command to be upper case.
+           Raises CommandException if a command cannot be parsed.
+        """
+        handler = self._commands.get(command[0].upper()) if command else None
+        if handler is None:
+            raise CommandException(
+                "Please enter a valid command, "
+                "type HELP for a list of available commands.")
+        handler(command[1:])
 
-        elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
+    def _register_player_commands(self):
+        """Registers the commands of the video player."""
+        player = self._player
+        commands = [
+            Command(
+                "NUMBER_OF_VIDEOS", lambda args: player.number_of_videos(),
+                "Shows how many videos are in the library.", max_args=None),
+            Command(
+                "SHOW_ALL_VIDEOS", lambda args: player.show_all_videos(),
+                "Lists all videos from the library.", max_args=None),
+            Command(
+                "PLAY", lambda args: player.play_video(*args),
+                "Plays specified video.", "<video_id>", 1, 1,
+                error="Please enter PLAY command followed by video_id."),
+            Command(
+                "PLAY_RANDOM", lambda args: player.play_random_video(),
+                "Plays a random video from the library.", max_args=None),
+            Command(
+                "STOP", lambda args: player.stop_video(),
+                "Stop the current video.", max_args=None),
+            Command(
+                "PAUSE", lambda args: player.pause_video(),
+                "Pause the current video.", max_args=None),
+            Command(
+                "CONTINUE", lambda args: player.continue_video(),
+                "Resume the current paused video.", max_args=None),
+            Command(
+                "SHOW_PLAYING", lambda args: player.show_playing(),
+                "Displays the title, url and paused status of the video that "
+                "is currently playing (or paused).", max_args=None),
+            Command(
+                "CREATE_PLAYLIST", lambda args: player.create_playlist(*args),
+                "Creates a new (empty) playlist with the provided name.",
+                "<playlist_name>", 1, 1,
+                error="Please enter CREATE_PLAYLIST command followed by a "
+                      "playlist name."),
+            Command(
+                "CREATE_SMART_PLAYLIST",
+                lambda args: player.create_smart_playlist(args[0], args[1:]),
+                "Creates a playlist kept filled with the videos matching all "
+                "terms: tag:<tag>, title:<text>, status:playable|flagged|any.",
+                "<playlist_name> <term>...", 2, None,
+                error="Please enter CREATE_SMART_PLAYLIST command followed by "
+                      "a playlist name and query terms."),
+            Command(
+                "ADD_TO_PLAYLIST", lambda args: player.add_to_playlist(*args),
+                "Adds the requested video to the playlist.",
+                "<playlist_name> <video_id>", 2, 2,
+                error="Please enter ADD_TO_PLAYLIST command followed by a "
+                      "playlist name and video_id to add."),
+            Command(
+                "INSERT_INTO_PLAYLIST",
+                lambda args: player.insert_into_playlist(*args),
+                "Adds the requested video to the playlist at the given "
+                "position.",
+                "<playlist_name> <video_id> <position>", 3, 3, numeric=(2,),
+                error="Please enter INSERT_INTO_PLAYLIST command followed by "
+                      "a playlist name, video_id to add and position number."),
+            Command(
+                "MOVE_IN_PLAYLIST", lambda args: player.move_in_playlist(*args),
+                "Moves a video of the playlist to the given position.",
+                "<playlist_name> <video_id> <position>", 3, 3, numeric=(2,),
+                error="Please enter MOVE_IN_PLAYLIST command followed by a "
+                      "playlist name, video_id to move and position number."),
+            Command(
+                "REMOVE_FROM_PLAYLIST",
+                lambda args: player.remove_from_playlist(*args),
+                "Removes the specified video from the specified playlist",
+                "<playlist_name> <video_id>", 2, 2,
+                error="Please enter REMOVE_FROM_PLAYLIST command followed by "
+                      "a playlist name and video_id to remove."),
+            Command(
+                "CLEAR_PLAYLIST", lambda args: player.clear_playlist(*args),
+                "Removes all the videos from the playlist.",
+                "<playlist_name>", 1, 1,
+                error="Please enter CLEAR_PLAYLIST command followed by a "
+                      "playlist name."),
+            Command(
+                "DELETE_PLAYLIST", lambda args: player.delete_playlist(*args),
+                "Deletes the playlist.", "<playlist_name>", 1, 1,
+                error="Please enter DELETE_PLAYLIST command followed by a "
+                      "playlist name."),
+            Command(
+                "SHOW_PLAYLIST", lambda args: player.show_playlist(*args),
+                "List all the videos in this playlist.", "<playlist_name>", 1, 1,
+                error="Please enter SHOW_PLAYLIST command followed by a "
+                      "playlist name."),
+            Command(
+                "SHOW_ALL_PLAYLISTS", lambda args: player.show_all_playlists(),
+                "Display all the available playlists.", max_args=None),
+            Command(
+                "SHOW_PLAYLISTS_WITH",
+                lambda args: player.show_playlists_with(*args),
+                "Display all the playlists containing the video.",
+                "<video_id>", 1, 1,
+                error="Please enter SHOW_PLAYLISTS_WITH command followed by a "
+                      "video_id."),
+            Command(
+                "SEARCH_VIDEOS", self._search_videos,
+                "Display all the videos whose titles contain the search_term. "
+                "With --fuzzy, title and tag words may differ by a few typos; "
+                "with --ranked, the videos whose title and tag words are most "
+                "relevant to the search words come first.",
+                "<search_term> [LIMIT <n>] [OFFSET <n>] [--no-prompt] "
+                "[--fuzzy | --ranked]", max_args=None),
+            Command(
+                "SEARCH_VIDEOS_WITH_TAG", self._search_videos_tag,
+                "Display all videos whose tags contains the provided tag. "
+                "Tags and title:<text> terms can be combined with AND, OR, "
+                "NOT and parentheses.",
+                "<tag_name> [LIMIT <n>] [OFFSET <n>] [--no-prompt]",
+                max_args=None),
+            Command(
+                "PLAY_RESULT", lambda args: player.play_result(*args),
+                "Plays a result of the last search.", "<number>", 1, 1,
+                numeric=(0,),
+                error="Please enter PLAY_RESULT command followed by a result "
+                      "number."),
+            Command(
+                "SUGGEST", self._suggest,
+                "Display the title words starting with the prefix, or the "
+                "tags if it starts with #, most used first; at most {} "
+                "(default 5).".format(MAX_COMPLETIONS),
+                "<prefix> [limit]", 1, 2, numeric=(1,),
+                error="Please enter SUGGEST command followed by a prefix and "
+                      "an optional number of suggestions."),
+            Command(
+                "SEARCH_CACHE_STATS",
+                lambda args: player.show_search_cache_stats(),
+                "Display the hits and misses of the search result cache.",
+                max_args=None),
+            Command(
+                "FLAG_VIDEO", lambda args: player.flag_video(*args),
+                "Mark a video as flagged.", "<video_id> <flag_reason>", 1, 2,
+                error="Please enter FLAG_VIDEO command followed by a "
+                      "video_id and an optional flag reason."),
+            Command(
+                "ALLOW_VIDEO", lambda args: player.allow_video(*args),
+                "Removes a flag from a video.", "<video_id>", 1, 1,
+                error="Please enter ALLOW_VIDEO command followed by a "
+                      "video_id."),
+            Command(
+                "HELP", lambda args: self._get_help(), "Displays help.",
+                max_args=None),
+        ]
+        for command in commands:
+            self.register(command)
 
-        elif command[0].upper() == "CLEAR_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CLEAR_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.clear_playlist(command[1])
+    def _suggest(self, args):
+        """Runs SUGGEST, whose limit cannot exceed the completions the
+        library keeps per prefix."""
+        if len(args) > 1 and args[1] > MAX_COMPLETIONS:
+            raise CommandException(
+                "Please enter SUGGEST command followed by a prefix and at "
+                "most {} as the number of suggestions.".format(MAX_COMPLETIONS))
+        self._player.suggest(*args)
 
-        elif command[0].upper() == "DELETE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter DELETE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.delete_playlist(command[1])
+    def _search_videos(self, args):
+        """Runs SEARCH_VIDEOS, whose options may come in any order."""
+        args, no_prompt = self._split_option(args, "--no-prompt")
+        args, fuzzy = self._split_option(args, "--fuzzy")
+        args, ranked = self._split_option(args, "--ranked")
+        args, limit, offset = self._split_paging(args)
+        if fuzzy and ranked:
+            raise CommandException(
+                "Please enter at most one of --fuzzy and --ranked.")
+        # word-based searches take several words, substring searches one
+        if not args or (len(args) > 1 and not (fuzzy or ranked)):
+            raise CommandException(
+                "Please enter SEARCH_VIDEOS command followed by a "
+                "search term.")
+        self._player.search_videos(
+            " ".join(args), limit, offset, self._prompt and not no_prompt,
+            fuzzy, ranked)
 
-        elif command[0].upper() == "SHOW_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SHOW_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.show_playlist(command[1])
+    def _search_videos_tag(self, args):
+        """Runs SEARCH_VIDEOS_WITH_TAG, whose query may be several words."""
+        args, no_prompt = self._split_option(args, "--no-prompt")
+        args, limit, offset = self._split_paging(args)
+        if not args:
+            raise CommandException(
+                "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
+                "video tag.")
+        self._player.search_videos_tag(
+            " ".join(args), limit, offset, self._prompt and not no_prompt)
 
-        elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
+    @staticmethod
+    def _split_option(args, option):
+        """Removes a flag option such as --no-prompt from the arguments.
 
-        elif command[0].upper() == "SEARCH_VIDEOS":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS command followed by a "
-                    "search term.")
-            self._player.search_videos(command[1])
+        Returns:
+            The other arguments, and whether the option was given.
+        """
+        rest = [word for word in args if word.lower() != option]
+        return rest, len(rest) != len(args)
 
-        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAG":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
-                    "video tag.")
-            self._player.search_videos_tag(command[1])
-
-        elif command[0].upper() == "FLAG_VIDEO":
-            if len(command) == 3:
-                self._player.flag_video(command[1], command[2])
-            elif len(command) == 2:
-                self._player.flag_video(command[1])
-            else:
-                raise CommandException(
-                    "Please enter FLAG_VIDEO command followed by a "
-                    "video_id and an optional flag reason.")
+    @staticmethod
+    def _split_paging(args):
+        """Splits trailing LIMIT <n> and OFFSET <n> options off the arguments.
 
-        elif command[0].upper() == "ALLOW_VIDEO":
-            if len(command) != 2:
+        Returns:
+            The other arguments, the limit (None if not given) and the
+            offset (0 if not given).
+        """
+        options = {}
+        while len(args) > 2 and args[-2].upper() in ("LIMIT", "OFFSET"):
+            option, value = args[-2].upper(), args[-1]
+            if not value.isdecimal() or option in options:
                 raise CommandException(
-                    "Please enter ALLOW_VIDEO command followed by a "
-                    "video_id.")
-            self._player.allow_video(command[1])
-
-        elif command[0].upper() == "HELP":
-            self._get_help()
-        else:
-            print(
-                "Please enter a valid command, type HELP for a list of "
-                "available commands.")
+                    "Please enter LIMIT and OFFSET at most once each, "
+                    "followed by a number.")
+            options[option] = int(value)
+            args = args[:-2]
+        return args, options.get("LIMIT"), options.get("OFFSET", 0)
 
     def _get_help(self):
         """Displays all available commands to the user."""
-        help_text = textwrap.dedent("""
-        Available commands:
-            NUMBER_OF_VIDEOS - Shows how many videos are in the library.
-            SHOW_ALL_VIDEOS - Lists all videos from the library.
-            PLAY <video_id> - Plays specified video.
-            PLAY_RANDOM - Plays a random video from the library.
-            STOP - Stop the current video.
-            PAUSE - Pause the current video.
-            CONTINUE - Resume the current paused video.
-            SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
-            CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
-            ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
-            REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
-            CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
-            DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
-            SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
-            SHOW_ALL_PLAYLISTS - Display all the available playlists.
-            SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
-            SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
-            FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
-            ALLOW_VIDEO <video_id> - Removes a flag from a video.
-            HELP - Displays help.
-            EXIT - Terminates the program execution.
-        """)
-        print(help_text)
+        lines = ["", "Available commands:"]
+        lines += ["    " + command.usage() for command in self._commands.values()]
+        # EXIT is handled by the program reading the commands
+        lines.append("    EXIT - Terminates the program execution.")
+        print("\n".join(lines) + "\n")
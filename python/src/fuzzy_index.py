@@ -0,0 +1,116 @@
+"""A typo-tolerant index of the words in video titles and tags."""
+
+import re
+
+from .bk_tree import BKTree
+
+
+_WORD = re.compile(r"\w+")
+
+
+def words_of(text):
+    """Returns the case-folded words of text, ignoring punctuation such
+    as the leading # of tags."""
+    return _WORD.findall(text.casefold())
+
+
+def word_prefix(text):
+    """Returns the case-folded start of a word typed as text.
+
+    A leading # is kept, so that the prefix only completes tags, as in
+    completion_counts; otherwise punctuation is ignored.
+    """
+    folded = text.strip().casefold()
+    if folded.startswith("#"):
+        return folded
+    words = words_of(folded)
+    return words[0] if words else ""
+
+
+def completion_counts(records):
+    """Counts the words that can complete a prefix.
+
+    Title words are counted as words_of finds them; tags are counted
+    whole, case-folded and with their leading #, so that they stay apart
+    from the title words they contain.
+
+    Args:
+        records: An iterable of (handle, title, tags) tuples.
+
+    Returns:
+        A dict of word or tag -> number of videos using it.
+    """
+    counts = {}
+    for _, title, tags in records:
+        words = set(words_of(title))
+        words.update("#" + tag.casefold().lstrip("#") for tag in tags)
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def default_max_distance(word):
+    """Returns the number of typos tolerated in a query word."""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+class FuzzyIndex:
+    """Finds videos whose title or tag words are close to query words.
+
+    Every distinct word is kept once in a BK-tree, with the handles of the
+    videos using it, so a query only computes edit distances to a small
+    part of the vocabulary instead of every word of the catalog.
+    """
+
+    def __init__(self, records):
+        """Builds the index.
+
+        Args:
+            records: An iterable of (handle, title, tags) tuples.
+        """
+        # word -> list of the handles of the videos using it
+        self._postings = {}
+        for handle, title, tags in records:
+            words = set(words_of(title))
+            for tag in tags:
+                words.update(words_of(tag))
+            for word in words:
+                self._postings.setdefault(word, []).append(handle)
+        self._tree = BKTree(self._postings)
+
+    def search(self, text, max_distance=None):
+        """Finds the videos matching every word of text, up to typos.
+
+        Args:
+            text: The query.
+            max_distance: The edit distance tolerated per query word; None
+                scales it with the word's length (see default_max_distance).
+
+        Returns:
+            A dict of handle -> total edit distance of the best match of
+            each query word. Empty if text has no words.
+        """
+        distances = None
+        for query_word in set(words_of(text)):
+            tolerance = (default_max_distance(query_word)
+                         if max_distance is None else max_distance)
+            word_distances = {}
+            for distance, word in self._tree.search(query_word, tolerance):
+                for handle in self._postings[word]:
+                    if distance < word_distances.get(handle, tolerance + 1):
+                        word_distances[handle] = distance
+            if distances is None:
+                distances = word_distances
+            else:
+                distances = {
+                    handle: distance + word_distances[handle]
+                    for handle, distance in distances.items()
+                    if handle in word_distances
+                }
+            if not distances:
+                break
+        return distances or {}
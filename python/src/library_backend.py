@@ -0,0 +1,106 @@
+"""The interface implemented by video library backends."""
+
+from abc import ABC, abstractmethod
+
+
+class LibraryBackend(ABC):
+    """A catalog of videos that a VideoPlayer can be built on.
+
+    Every method returning several videos returns them sorted by title,
+    ties in catalog order. All of them except get_all_videos leave flagged
+    videos out.
+
+    Listeners added with add_listener are called with the handle of every
+    video whose state changes, e.g. when it is flagged or allowed.
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Calls listener(handle) whenever the state of a video changes."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stops calling a listener added with add_listener."""
+        self._listeners.remove(listener)
+
+    def _notify_listeners(self, handle):
+        """Tells every listener that the video with handle changed."""
+        for listener in list(self._listeners):
+            listener(handle)
+
+    @abstractmethod
+    def __len__(self):
+        """Returns the number of videos in the catalog."""
+
+    @abstractmethod
+    def get_all_videos(self):
+        """Returns a list of every Video in the catalog."""
+
+    @abstractmethod
+    def get_video(self, video_id):
+        """Returns the Video with the given id, or None."""
+
+    @abstractmethod
+    def handle_of(self, video_id):
+        """Returns the integer handle of a video, or None if it does not
+        exist. Handles are stable for the lifetime of the backend."""
+
+    @abstractmethod
+    def video_by_handle(self, handle):
+        """Returns the Video with the given handle."""
+
+    @abstractmethod
+    def get_videos_with_tag(self, video_tag):
+        """Returns the unflagged videos carrying video_tag, in any case."""
+
+    @abstractmethod
+    def search_titles(self, search_term, limit=None, offset=0):
+        """Returns the unflagged videos whose title contains search_term,
+        compared case-insensitively.
+
+        Only the page of limit matches (all of them if None) after the
+        first offset ones is returned; query_videos pages the same way.
+        """
+
+    @abstractmethod
+    def query_videos(self, query, limit=None, offset=0):
+        """Returns the unflagged videos selected by a boolean search query,
+        as built by search_query.parse_search_query."""
+
+    @abstractmethod
+    def fuzzy_search(self, search_term, limit=None, offset=0):
+        """Returns the unflagged videos whose title or tag words match every
+        word of search_term up to a few typos, closest matches first, ties
+        sorted by title. Pages like search_titles."""
+
+    @abstractmethod
+    def ranked_search(self, search_term, limit=10, offset=0):
+        """Returns the limit unflagged videos after the first offset that
+        best match the words of search_term by BM25 relevance over title
+        and tag words, most relevant first."""
+
+    @abstractmethod
+    def suggest(self, prefix, limit):
+        """Returns up to limit (at most prefix_trie.MAX_COMPLETIONS) title
+        words starting with prefix, in any case, used by the most videos
+        first; a prefix starting with # completes to #tags instead."""
+
+    @abstractmethod
+    def get_flagged_videos(self):
+        """Returns the flagged videos."""
+
+    @abstractmethod
+    def random_video(self, rng):
+        """Returns a uniformly random unflagged video, or None if there is
+        none, drawing from rng (a random.Random or the random module)."""
+
+    @abstractmethod
+    def flag_video(self, video_id, reason=""):
+        """Flags a video. Returns it, or None if it does not exist."""
+
+    @abstractmethod
+    def allow_video(self, video_id):
+        """Removes the flag from a video. Returns it, or None if it does
+        not exist."""
@@ -0,0 +1,166 @@
+"""An ordered sequence of distinct integer keys with logarithmic positional
+edits."""
+
+from array import array
+import random
+
+
+# Priorities only need to be random, not unpredictable.
+_priorities = random.Random(0)
+
+# Slot number standing for "no node".
+_NIL = -1
+
+
+class OrderStatisticTree:
+    """A sequence of distinct integer keys.
+
+    Backed by an implicit treap: nodes are ordered by position rather than
+    by key, and each node knows its subtree size and parent. Nodes are
+    slots in parallel arrays rather than Python objects, and freed slots
+    are reused. A dict maps every key to its slot, so membership is O(1),
+    and finding a key's position, inserting at a position, removing a key
+    and moving a key are all O(log n) expected.
+    """
+
+    def __init__(self, keys=()):
+        """Builds a sequence holding keys, in order."""
+        self.clear()
+        for key in keys:
+            self.append(key)
+
+    def clear(self):
+        """Removes every key."""
+        self._keys = array("q")
+        self._priorities = array("d")
+        self._sizes = array("q")
+        self._lefts = array("q")
+        self._rights = array("q")
+        self._parents = array("q")
+        self._free_slots = []
+        self._slots = {}
+        self._root = _NIL
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __iter__(self):
+        """Yields the keys in order, without copying them."""
+        stack = []
+        node = self._root
+        while stack or node != _NIL:
+            while node != _NIL:
+                stack.append(node)
+                node = self._lefts[node]
+            node = stack.pop()
+            yield self._keys[node]
+            node = self._rights[node]
+
+    def _new_node(self, key):
+        """Returns a slot holding a fresh, detached node for key."""
+        priority = _priorities.random()
+        if self._free_slots:
+            node = self._free_slots.pop()
+            self._keys[node] = key
+            self._priorities[node] = priority
+            self._sizes[node] = 1
+            self._lefts[node] = self._rights[node] = self._parents[node] = _NIL
+        else:
+            node = len(self._keys)
+            self._keys.append(key)
+            self._priorities.append(priority)
+            self._sizes.append(1)
+            self._lefts.append(_NIL)
+            self._rights.append(_NIL)
+            self._parents.append(_NIL)
+        self._slots[key] = node
+        return node
+
+    def _size(self, node):
+        return self._sizes[node] if node != _NIL else 0
+
+    def _update(self, node):
+        """Recomputes a node's subtree size and re-parents its children."""
+        left, right = self._lefts[node], self._rights[node]
+        self._sizes[node] = 1 + self._size(left) + self._size(right)
+        if left != _NIL:
+            self._parents[left] = node
+        if right != _NIL:
+            self._parents[right] = node
+
+    def _merge(self, left, right):
+        """Joins two treaps, every key of left coming before right's."""
+        if left == _NIL:
+            return right
+        if right == _NIL:
+            return left
+        if self._priorities[left] > self._priorities[right]:
+            self._rights[left] = self._merge(self._rights[left], right)
+            self._update(left)
+            return left
+        self._lefts[right] = self._merge(left, self._lefts[right])
+        self._update(right)
+        return right
+
+    def _split(self, node, count):
+        """Splits a treap into its first `count` keys and the rest."""
+        if node == _NIL:
+            return _NIL, _NIL
+        left_size = self._size(self._lefts[node])
+        if left_size >= count:
+            left, self._lefts[node] = self._split(self._lefts[node], count)
+            self._update(node)
+            return left, node
+        self._rights[node], right = self._split(
+            self._rights[node], count - left_size - 1)
+        self._update(node)
+        return node, right
+
+    def _set_root(self, root):
+        self._root = root
+        if root != _NIL:
+            self._parents[root] = _NIL
+
+    def index(self, key):
+        """Returns the position of key. Raises KeyError if it is absent."""
+        node = self._slots[key]
+        position = self._size(self._lefts[node])
+        parent = self._parents[node]
+        while parent != _NIL:
+            if self._rights[parent] == node:
+                position += self._size(self._lefts[parent]) + 1
+            node, parent = parent, self._parents[parent]
+        return position
+
+    def insert(self, index, key):
+        """Inserts key before position index (clamped to the sequence).
+
+        Raises:
+            ValueError: If key is already in the sequence.
+        """
+        if key in self._slots:
+            raise ValueError("{!r} is already in the sequence".format(key))
+        node = self._new_node(key)
+        left, right = self._split(self._root, max(0, index))
+        self._set_root(self._merge(self._merge(left, node), right))
+
+    def append(self, key):
+        """Adds key at the end of the sequence."""
+        self.insert(len(self._slots), key)
+
+    def remove(self, key):
+        """Removes key. Raises KeyError if it is absent."""
+        position = self.index(key)
+        left, right = self._split(self._root, position)
+        node, right = self._split(right, 1)
+        del self._slots[key]
+        self._free_slots.append(node)
+        self._set_root(self._merge(left, right))
+
+    def move(self, key, index):
+        """Moves key so that it ends up at position index."""
+        self.remove(key)
+        self.insert(index, key)
@@ -0,0 +1,33 @@
+"""A reverse index from videos to the playlists containing them."""
+
+
+class PlaylistMembership:
+    """Tracks which playlists contain each video.
+
+    Playlists report every video they gain or lose, so the playlists
+    containing a video are known without scanning any playlist.
+    """
+
+    def __init__(self):
+        """The PlaylistMembership class is initialized."""
+        # video handle -> set of the Playlists containing it
+        self._playlists = {}
+
+    def add(self, handle, playlist):
+        """Records that playlist contains the video with handle."""
+        self._playlists.setdefault(handle, set()).add(playlist)
+
+    def discard(self, handle, playlist):
+        """Records that playlist no longer contains the video with handle."""
+        playlists = self._playlists.get(handle)
+        if playlists is not None:
+            playlists.discard(playlist)
+            if not playlists:
+                del self._playlists[handle]
+
+    def playlists_with(self, handle):
+        """Returns the set of playlists containing the video with handle.
+
+        The set is the index's own; callers must not modify it.
+        """
+        return self._playlists.get(handle, frozenset())
@@ -0,0 +1,210 @@
+"""A durable store for playlists.
+
+Playlist changes are appended to a journal, one JSON array per line:
+``[sequence, operation, playlist_name, *arguments]``. Every so often the
+whole state is compacted into a snapshot holding the last sequence number
+it includes, and the journal is started afresh. On start-up the snapshot
+is loaded and the journal entries after it are replayed.
+
+Entries are buffered and written in batches (group commit): one write and
+one fsync per batch rather than per command. Entries still in the buffer
+are lost if the process dies without calling flush() or close(), so an
+interactive session flushes before waiting for each command.
+"""
+
+from pathlib import Path
+import json
+import os
+import tempfile
+
+from .order_statistic_tree import OrderStatisticTree
+
+
+SNAPSHOT_NAME = "playlists.snapshot"
+JOURNAL_NAME = "playlists.journal"
+
+
+class PlaylistStore:
+    """A class used to persist playlists to a directory."""
+
+    def __init__(self, directory, batch_size=32, compact_after=1000):
+        """Opens the store, loading its current state.
+
+        Args:
+            directory: Directory holding the snapshot and journal; created
+                if needed.
+            batch_size: Number of buffered entries that triggers a flush.
+            compact_after: Number of journal entries that triggers a
+                compaction on flush.
+        """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._batch_size = batch_size
+        self._compact_after = compact_after
+        self._buffer = []
+        # case-folded name -> [display name, OrderStatisticTree of video id
+        # numbers], and case-folded name -> [display name, query text] for
+        # smart playlists. Video ids are numbered so that the playlists can
+        # be kept in trees, making every change O(log n) like the player's.
+        self._playlists = {}
+        self._smart_playlists = {}
+        self._id_numbers = {}
+        self._video_ids = []
+        self._sequence = 0
+        self._journal_entries = 0
+        self._load()
+        self._journal = open(self._directory / JOURNAL_NAME, "a")
+
+    def _load(self):
+        """Loads the snapshot and replays the journal on top of it."""
+        try:
+            with open(self._directory / SNAPSHOT_NAME) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except FileNotFoundError:
+            snapshot = {"sequence": 0, "playlists": []}
+        self._sequence = snapshot["sequence"]
+        for name, video_ids in snapshot["playlists"]:
+            self._playlists[name.casefold()] = [
+                name, OrderStatisticTree(map(self._number, video_ids))]
+        for name, query in snapshot.get("smart_playlists", []):
+            self._smart_playlists[name.casefold()] = [name, query]
+
+        journal_path = self._directory / JOURNAL_NAME
+        committed = 0
+        try:
+            with open(journal_path, "rb") as journal_file:
+                for line in journal_file:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated entry")
+                        sequence, operation, *arguments = json.loads(line)
+                    except ValueError:
+                        # A torn write at the end of the journal: cut it
+                        # off so that new entries are not appended after it.
+                        os.truncate(journal_path, committed)
+                        break
+                    committed += len(line)
+                    self._journal_entries += 1
+                    if sequence > self._sequence:
+                        self._apply(operation, *arguments)
+                        self._sequence = sequence
+        except FileNotFoundError:
+            pass
+
+    def _number(self, video_id):
+        """Returns the number standing for a video id, assigning one first
+        if needed."""
+        number = self._id_numbers.get(video_id)
+        if number is None:
+            number = self._id_numbers[video_id] = len(self._video_ids)
+            self._video_ids.append(video_id)
+        return number
+
+    def _ids_of(self, numbers):
+        """Returns the list of video ids of a tree of numbers, in order."""
+        return [self._video_ids[number] for number in numbers]
+
+    def _apply(self, operation, name, *arguments):
+        """Applies a journal entry to the in-memory state."""
+        key = name.casefold()
+        if operation == "create":
+            self._playlists.setdefault(key, [name, OrderStatisticTree()])
+        elif operation == "smart":
+            self._smart_playlists.setdefault(key, [name, arguments[0]])
+        elif operation == "delete":
+            self._playlists.pop(key, None)
+            self._smart_playlists.pop(key, None)
+        elif key in self._playlists:
+            numbers = self._playlists[key][1]
+            number = self._number(arguments[0]) if arguments else None
+            if operation == "add" and number not in numbers:
+                numbers.append(number)
+            elif operation == "remove" and number in numbers:
+                numbers.remove(number)
+            elif operation == "clear":
+                numbers.clear()
+            elif operation == "insert" and number not in numbers:
+                numbers.insert(arguments[1], number)
+            elif operation == "move" and number in numbers:
+                numbers.move(number, arguments[1])
+
+    def playlists(self):
+        """Returns the stored playlists.
+
+        Returns:
+            A list of (name, video_ids) tuples, in creation order.
+        """
+        return [
+            (name, self._ids_of(numbers)) for name, numbers in self._playlists.values()
+        ]
+
+    def smart_playlists(self):
+        """Returns the stored smart playlists.
+
+        Returns:
+            A list of (name, query text) tuples, in creation order.
+        """
+        return [tuple(entry) for entry in self._smart_playlists.values()]
+
+    def record(self, operation, name, *arguments):
+        """Records a playlist change.
+
+        Args:
+            operation: One of "create", "smart", "add", "insert", "move",
+                "remove", "clear", "delete".
+            name: The playlist name.
+            arguments: The query text, for "smart"; the video id, for
+                "add", "insert", "move" and "remove", followed by the
+                0-based position for "insert" and "move".
+        """
+        self._sequence += 1
+        self._apply(operation, name, *arguments)
+        self._buffer.append(
+            json.dumps([self._sequence, operation, name, *arguments]) + "\n")
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes and fsyncs the buffered entries, compacting if due."""
+        if self._buffer:
+            self._journal.write("".join(self._buffer))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_entries += len(self._buffer)
+            self._buffer = []
+        if self._journal_entries >= self._compact_after:
+            self.compact()
+
+    def compact(self):
+        """Writes the whole state to the snapshot and empties the journal.
+
+        The snapshot is written under a temporary name and moved into
+        place, so a crash leaves either the old or the new one. Journal
+        entries it already includes are skipped by sequence number, so a
+        crash before the journal is emptied is harmless too.
+        """
+        # The snapshot covers the buffered entries too.
+        self._buffer = []
+        snapshot = {
+            "sequence": self._sequence,
+            "playlists": [
+                [name, self._ids_of(numbers)]
+                for name, numbers in self._playlists.values()
+            ],
+            "smart_playlists": list(self._smart_playlists.values()),
+        }
+        descriptor, temporary = tempfile.mkstemp(
+            dir=self._directory, prefix=SNAPSHOT_NAME, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary, self._directory / SNAPSHOT_NAME)
+        self._journal.close()
+        self._journal = open(self._directory / JOURNAL_NAME, "w")
+        self._journal_entries = 0
+
+    def close(self):
+        """Flushes the buffered entries and closes the journal."""
+        self.flush()
+        self._journal.close()
@@ -0,0 +1,98 @@
+"""A compressed prefix trie for autocompletion."""
+
+
+# Completions precomputed per node; longer requests are capped to this.
+MAX_COMPLETIONS = 10
+
+
+class _Node:
+    """A trie node. Edges are keyed by their first character and carry the
+    rest of their label, so chains of single-child nodes are collapsed."""
+
+    __slots__ = ("edges", "weight", "top")
+
+    def __init__(self):
+        # first character -> (edge label, child node)
+        self.edges = {}
+        # weight of the word ending here, None if no word does
+        self.weight = None
+        # best completions below this node, as (-weight, word), best first
+        self.top = []
+
+
+class PrefixTrie:
+    """A set of weighted words answering "best words starting with".
+
+    Every node keeps the best MAX_COMPLETIONS words below it, heaviest
+    first, ties in alphabetical order. A query walks down the prefix and
+    reads that list, so it costs the prefix length plus the results, not
+    the number of words sharing the prefix.
+    """
+
+    def __init__(self, weights):
+        """Builds the trie.
+
+        Args:
+            weights: A mapping of word -> weight, e.g. how many videos use
+                the word.
+        """
+        self._root = _Node()
+        for word, weight in weights.items():
+            self._insert(word, weight)
+        self._rank(self._root, "")
+
+    def _insert(self, word, weight):
+        node = self._root
+        rest = word
+        while rest:
+            edge = node.edges.get(rest[0])
+            if edge is None:
+                child = _Node()
+                node.edges[rest[0]] = (rest, child)
+                node = child
+                break
+            label, child = edge
+            common = 0
+            while (common < len(label) and common < len(rest)
+                   and label[common] == rest[common]):
+                common += 1
+            if common < len(label):
+                # split the edge where the word leaves it
+                middle = _Node()
+                middle.edges[label[common]] = (label[common:], child)
+                node.edges[rest[0]] = (label[:common], middle)
+                child = middle
+            node = child
+            rest = rest[common:]
+        node.weight = weight
+
+    def _rank(self, node, prefix):
+        """Fills in the top lists below node, whose words start with prefix."""
+        candidates = []
+        if node.weight is not None:
+            candidates.append((-node.weight, prefix))
+        for label, child in node.edges.values():
+            self._rank(child, prefix + label)
+            candidates.extend(child.top)
+        candidates.sort()
+        node.top = candidates[:MAX_COMPLETIONS]
+
+    def complete(self, prefix, limit=MAX_COMPLETIONS):
+        """Returns up to limit (at most MAX_COMPLETIONS) words starting with
+        prefix, heaviest first, ties in alphabetical order."""
+        node = self._root
+        rest = prefix
+        while rest:
+            edge = node.edges.get(rest[0])
+            if edge is None:
+                return []
+            label, child = edge
+            if label.startswith(rest):
+                # the prefix ends inside this edge
+                node = child
+                break
+            if not rest.startswith(label):
+                return []
+            node = child
+            rest = rest[len(label):]
+        return [word for _, word in node.top[:limit]]
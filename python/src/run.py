@@ -1,15 +1,46 @@
-"""A youtube terminal simulator."""
+"""A youtube terminal simulator.
+
+Run without arguments it reads commands interactively. Given a script
+file, or "-" or a pipe for standard input, it runs the commands in batch
+mode: no prompts, buffered output, and a summary of failures and
+throughput on standard error at the end.
+"""
+from contextlib import redirect_stdout
+from pathlib import Path
+import argparse
+import io
+import os
+import sys
+import time
+
 from .video_player import VideoPlayer
 from .command_parser import CommandException
 from .command_parser import CommandParser
+from .playlist_store import PlaylistStore
 
 
-if __name__ == "__main__":
+# Where playlists are saved between runs, unless YT_PLAYLISTS_DIR is set.
+DEFAULT_PLAYLISTS_DIR = Path.home() / ".youtube_playlists"
+
+# Size of the output buffer in batch mode.
+BATCH_BUFFER_SIZE = 1 << 20
+
+
+def run_interactive(parser, playlist_store=None):
+    """Reads and runs commands from the terminal until EXIT.
+
+    Args:
+        parser: The CommandParser running the commands.
+        playlist_store: The PlaylistStore the playlists are saved to, if
+            any. It is flushed before every prompt, so that a change
+            already shown to the user survives a crash while waiting for
+            the next command; at typing speed that costs nothing.
+    """
     print("""Hello and welcome to YouTube, what would you like to do?
     Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
-    parser = CommandParser(video_player)
     while True:
+        if playlist_store is not None:
+            playlist_store.flush()
         command = input("YT> ")
         if command.upper() == "EXIT":
             break
@@ -19,3 +50,86 @@ if __name__ == "__main__":
             print(e)
     print("YouTube has now terminated its execution. "
           "Thank you and goodbye!")
+
+
+def run_batch(parser, lines, output, report=sys.stderr):
+    """Runs the commands of a script, one per line, until EXIT or the end.
+
+    Blank lines and lines starting with # are skipped. A failing command is
+    reported and the script carries on.
+
+    Args:
+        parser: The CommandParser running the commands; it should not
+            prompt.
+        lines: An iterable of command lines.
+        output: The stream the commands print to.
+        report: The stream the summary is written to.
+
+    Returns:
+        A list of (line number, line, error message) for the commands
+        that failed.
+    """
+    failures = []
+    commands = 0
+    started = time.perf_counter()
+    with redirect_stdout(output):
+        for number, line in enumerate(lines, 1):
+            command = line.split()
+            if not command or command[0].startswith("#"):
+                continue
+            if command[0].upper() == "EXIT":
+                break
+            commands += 1
+            try:
+                parser.execute_command(command)
+            except CommandException as e:
+                print(e)
+                failures.append((number, line.strip(), str(e)))
+            except Exception as e:
+                # one broken command must not lose the rest of the script
+                failures.append((number, line.strip(), repr(e)))
+    output.flush()
+    elapsed = time.perf_counter() - started
+
+    for number, line, message in failures:
+        print("line {}: {}: {}".format(number, line, message), file=report)
+    print(
+        "{} commands in {:.3f}s ({:.0f} commands/s), {} failed".format(
+            commands, elapsed, commands / elapsed if elapsed else 0.0,
+            len(failures)),
+        file=report)
+    return failures
+
+
+def main(argv=None):
+    """Runs the simulator; returns the process exit status."""
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument(
+        "script", nargs="?",
+        help='file of commands to run in batch mode, "-" for standard input')
+    arguments = arguments.parse_args(argv)
+    batch = arguments.script is not None or not sys.stdin.isatty()
+
+    playlist_store = PlaylistStore(
+        os.environ.get("YT_PLAYLISTS_DIR", DEFAULT_PLAYLISTS_DIR))
+    video_player = VideoPlayer(playlist_store=playlist_store)
+    parser = CommandParser(video_player, prompt=not batch)
+    try:
+        if not batch:
+            run_interactive(parser, playlist_store)
+            return 0
+        output = io.open(
+            sys.stdout.fileno(), "w", buffering=BATCH_BUFFER_SIZE,
+            encoding=sys.stdout.encoding, closefd=False)
+        if arguments.script in (None, "-"):
+            failures = run_batch(parser, sys.stdin, output)
+        else:
+            with open(arguments.script) as script:
+                failures = run_batch(parser, script, output)
+        return 1 if failures else 0
+    finally:
+        video_player.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
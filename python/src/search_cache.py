@@ -0,0 +1,77 @@
+"""A cache of search results."""
+
+from collections import OrderedDict
+
+from .search_query import TitleTerm, query_key, query_matches
+
+
+class SearchCache:
+    """A least-recently-used cache of search results.
+
+    Entries map a normalized query and page to the handles of the videos
+    found, so that repeated searches skip the indexes. The cache follows
+    the library: when a video changes, only the entries whose query selects
+    that video, flagged or not, are dropped. Both the number of entries and
+    the total number of cached handles are bounded.
+    """
+
+    def __init__(self, video_library, max_entries=256, max_results=100000):
+        """The SearchCache class is initialized.
+
+        Args:
+            video_library: The LibraryBackend to search.
+            max_entries: The most searches to keep.
+            max_results: The most result handles to keep, over all entries.
+        """
+        self._library = video_library
+        self._max_entries = max_entries
+        self._max_results = max_results
+        # key -> (query, tuple of result handles), least recently used first
+        self._entries = OrderedDict()
+        self._results = 0
+        self.hits = 0
+        self.misses = 0
+        video_library.add_listener(self.video_changed)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def search_titles(self, search_term, limit=None, offset=0):
+        """Returns the library's search_titles results, cached."""
+        return self.query_videos(TitleTerm(search_term), limit, offset)
+
+    def query_videos(self, query, limit=None, offset=0):
+        """Returns the library's query_videos results, cached."""
+        key = (query_key(query), limit, offset)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return [self._library.video_by_handle(handle) for handle in entry[1]]
+
+        self.misses += 1
+        videos = self._library.query_videos(query, limit, offset)
+        handles = tuple(self._library.handle_of(video.video_id) for video in videos)
+        if len(handles) <= self._max_results:
+            self._entries[key] = (query, handles)
+            self._results += len(handles)
+            while (len(self._entries) > self._max_entries
+                   or self._results > self._max_results):
+                self._drop(next(iter(self._entries)))
+        return videos
+
+    def _drop(self, key):
+        _, handles = self._entries.pop(key)
+        self._results -= len(handles)
+
+    def video_changed(self, handle):
+        """Drops the entries whose query selects the video with handle."""
+        video = self._library.video_by_handle(handle)
+        for key, (query, _) in list(self._entries.items()):
+            if query_matches(query, video):
+                self._drop(key)
+
+    def clear(self):
+        """Drops every entry, e.g. after the whole catalog changed."""
+        self._entries.clear()
+        self._results = 0
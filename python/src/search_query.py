@@ -0,0 +1,153 @@
+"""Boolean search queries over tags and title terms.
+
+A query is written as terms joined by AND, OR and NOT, with parentheses
+for grouping; NOT binds tightest and OR loosest, and terms written next to
+each other are ANDed. A term is a tag, e.g. ``#cat``, or ``title:<text>``
+for a case-insensitive title substring::
+
+    #cat AND NOT title:amazing
+    (#dog OR #cat) #animal
+"""
+
+
+class TagTerm:
+    """Selects the videos carrying a tag, compared case-insensitively."""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+
+class TitleTerm:
+    """Selects the videos whose title contains a text, case-insensitively."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class AndQuery:
+    """Selects the videos selected by every one of its parts."""
+
+    def __init__(self, parts):
+        self.parts = list(parts)
+
+
+class OrQuery:
+    """Selects the videos selected by any of its parts."""
+
+    def __init__(self, parts):
+        self.parts = list(parts)
+
+
+class NotQuery:
+    """Selects the videos its part does not select."""
+
+    def __init__(self, part):
+        self.part = part
+
+
+def _tokens(text_tokens):
+    """Splits the parentheses off a list of whitespace-separated tokens."""
+    tokens = []
+    for token in text_tokens:
+        while token.startswith("("):
+            tokens.append("(")
+            token = token[1:]
+        closing = len(token) - len(token.rstrip(")"))
+        if token[:len(token) - closing]:
+            tokens.append(token[:len(token) - closing])
+        tokens.extend(")" * closing)
+    return tokens
+
+
+def parse_search_query(text_tokens):
+    """Parses a boolean search query.
+
+    Args:
+        text_tokens: The whitespace-separated words of the query.
+
+    Returns:
+        The query: a TagTerm, TitleTerm, AndQuery, OrQuery or NotQuery.
+
+    Raises:
+        ValueError: If the query is empty or malformed.
+    """
+    tokens = _tokens(text_tokens)
+    position = 0
+
+    def peek():
+        return tokens[position].upper() if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        if position == len(tokens):
+            raise ValueError("Unexpected end of query")
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        parts = [parse_and()]
+        while peek() == "OR":
+            take()
+            parts.append(parse_and())
+        return parts[0] if len(parts) == 1 else OrQuery(parts)
+
+    def parse_and():
+        parts = [parse_unary()]
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                take()
+            parts.append(parse_unary())
+        return parts[0] if len(parts) == 1 else AndQuery(parts)
+
+    def parse_unary():
+        token = take()
+        if token.upper() == "NOT":
+            return NotQuery(parse_unary())
+        if token == "(":
+            query = parse_or()
+            if take() != ")":
+                raise ValueError("Missing )")
+            return query
+        if token.upper() in ("AND", "OR") or token == ")":
+            raise ValueError("Unexpected {}".format(token))
+        field, separator, value = token.partition(":")
+        if separator and field.lower() == "title":
+            if not value:
+                raise ValueError("Empty title term")
+            return TitleTerm(value)
+        return TagTerm(token)
+
+    query = parse_or()
+    if position != len(tokens):
+        raise ValueError("Unexpected {}".format(tokens[position]))
+    return query
+
+
+def query_key(query):
+    """Returns a hashable normal form of a query.
+
+    Terms are case-folded and the parts of AND and OR are sorted and
+    deduplicated, so queries differing only in those respects share a key.
+    """
+    if isinstance(query, TagTerm):
+        return ("tag", query.tag.casefold())
+    if isinstance(query, TitleTerm):
+        return ("title", query.text.casefold())
+    if isinstance(query, NotQuery):
+        return ("not", query_key(query.part))
+    kind = "and" if isinstance(query, AndQuery) else "or"
+    return (kind, tuple(sorted({query_key(part) for part in query.parts})))
+
+
+def query_matches(query, video):
+    """Returns whether a query selects video, whatever its flag state."""
+    if isinstance(query, TagTerm):
+        folded_tag = query.tag.casefold()
+        return any(tag.casefold() == folded_tag for tag in video.tags)
+    if isinstance(query, TitleTerm):
+        return query.text.casefold() in video.title.casefold()
+    if isinstance(query, AndQuery):
+        return all(query_matches(part, video) for part in query.parts)
+    if isinstance(query, OrQuery):
+        return any(query_matches(part, video) for part in query.parts)
+    return not query_matches(query.part, video)
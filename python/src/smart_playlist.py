@@ -0,0 +1,186 @@
+"""Playlists whose videos are chosen by a query over the catalog."""
+
+from bisect import bisect_left, insort
+
+
+# Flag states a query can select, by the name used in query terms.
+STATUSES = ("playable", "flagged", "any")
+
+
+class VideoQuery:
+    """A query selecting videos by tag, title substring and flag state.
+
+    Written as space-separated terms: ``tag:<tag>`` and ``title:<text>``
+    may each be repeated and must all match, ``status:<status>`` selects
+    unflagged ("playable", the default), flagged or any videos. Tags and
+    titles are compared case-insensitively.
+    """
+
+    def __init__(self, tags=(), titles=(), status="playable"):
+        """The VideoQuery class is initialized.
+
+        Args:
+            tags: Tags a video must all carry.
+            titles: Substrings its title must all contain.
+            status: One of STATUSES.
+        """
+        if status not in STATUSES:
+            raise ValueError("status:{}".format(status))
+        self.tags = tuple(tags)
+        self.titles = tuple(titles)
+        self.status = status
+        self._folded_tags = {tag.casefold() for tag in self.tags}
+        self._folded_titles = [title.casefold() for title in self.titles]
+
+    @classmethod
+    def parse(cls, terms):
+        """Builds a query from its terms.
+
+        Args:
+            terms: A list of query terms, e.g. ["tag:#cat", "status:any"].
+
+        Returns:
+            The VideoQuery.
+
+        Raises:
+            ValueError: If a term is not understood; its message is the term.
+        """
+        tags = []
+        titles = []
+        status = "playable"
+        for term in terms:
+            field, _, value = term.partition(":")
+            field = field.lower()
+            if not value:
+                raise ValueError(term)
+            if field == "tag":
+                tags.append(value)
+            elif field == "title":
+                titles.append(value)
+            elif field == "status" and value.lower() in STATUSES:
+                status = value.lower()
+            else:
+                raise ValueError(term)
+        return cls(tags, titles, status)
+
+    def __str__(self):
+        terms = ["tag:{}".format(tag) for tag in self.tags]
+        terms += ["title:{}".format(title) for title in self.titles]
+        terms.append("status:{}".format(self.status))
+        return " ".join(terms)
+
+    def matches(self, video):
+        """Returns whether video is selected by the query."""
+        if self.status == "playable" and video.flagged:
+            return False
+        if self.status == "flagged" and not video.flagged:
+            return False
+        if self._folded_tags and not self._folded_tags <= {
+            tag.casefold() for tag in video.tags
+        }:
+            return False
+        folded_title = video.title.casefold()
+        return all(title in folded_title for title in self._folded_titles)
+
+    def candidates(self, video_library):
+        """Returns a list of videos including every video the query selects.
+
+        The unflagged candidates come from the library's tag or title
+        index, using the first tag or title term; the flagged ones are the
+        library's flagged videos.
+        """
+        candidates = []
+        if self.status != "flagged":
+            if self.tags:
+                candidates += video_library.get_videos_with_tag(self.tags[0])
+            elif self.titles:
+                candidates += video_library.search_titles(self.titles[0])
+            else:
+                candidates += [video for video in video_library.get_all_videos()
+                               if not video.flagged]
+        if self.status != "playable":
+            candidates += video_library.get_flagged_videos()
+        return candidates
+
+
+class SmartPlaylist:
+    """A playlist holding the videos selected by a VideoQuery.
+
+    Its videos are found once through the library's indexes when it is
+    created. After that the library tells it about every video whose state
+    changes, and only that video is checked against the query again, so
+    showing the playlist never re-runs the query. Videos are kept sorted by
+    title, ties in handle order.
+    """
+
+    def __init__(self, playlist_name, video_library, query, membership=None):
+        """The SmartPlaylist class is initialized.
+
+        Args:
+            playlist_name: The name the playlist is shown with.
+            video_library: The LibraryBackend to select videos from.
+            query: The VideoQuery selecting the videos.
+            membership: A PlaylistMembership to report added and removed
+                videos to, if any.
+        """
+        self._name = playlist_name
+        self._library = video_library
+        self._membership = membership
+        self.query = query
+        # (title, handle) of every selected video, sorted, and the handles
+        self._entries = []
+        self._handles = set()
+        for video in query.candidates(video_library):
+            if query.matches(video):
+                self._add(video_library.handle_of(video.video_id), video)
+        video_library.add_listener(self.video_changed)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def videos(self):
+        """Yields the videos of the playlist, in order."""
+        for _, handle in self._entries:
+            yield self._library.video_by_handle(handle)
+
+    def get_name(self):
+        """Returns playlist name"""
+        return self._name
+
+    def get_video(self, video_id):
+        """Returns the Video with video_id if it is in the playlist, or None."""
+        handle = self._library.handle_of(video_id)
+        if handle is None or handle not in self._handles:
+            return None
+        return self._library.video_by_handle(handle)
+
+    def _add(self, handle, video):
+        if handle not in self._handles:
+            insort(self._entries, (video.title, handle))
+            self._handles.add(handle)
+            if self._membership is not None:
+                self._membership.add(handle, self)
+
+    def _remove(self, handle, video):
+        if handle in self._handles:
+            del self._entries[bisect_left(self._entries, (video.title, handle))]
+            self._handles.discard(handle)
+            if self._membership is not None:
+                self._membership.discard(handle, self)
+
+    def video_changed(self, handle):
+        """Checks the video with handle against the query again."""
+        video = self._library.video_by_handle(handle)
+        if self.query.matches(video):
+            self._add(handle, video)
+        else:
+            self._remove(handle, video)
+
+    def close(self):
+        """Stops following the library and empties the playlist."""
+        self._library.remove_listener(self.video_changed)
+        if self._membership is not None:
+            for handle in self._handles:
+                self._membership.discard(handle, self)
+        self._entries = []
+        self._handles = set()
@@ -0,0 +1,309 @@
+"""A video library backend stored in SQLite."""
+
+import random
+import sqlite3
+import weakref
+
+from .bm25_index import Bm25Index
+from .fuzzy_index import FuzzyIndex, completion_counts, word_prefix
+from .library_backend import LibraryBackend
+from .prefix_trie import PrefixTrie
+from .search_query import AndQuery, NotQuery, OrQuery, TagTerm, TitleTerm
+from .video import Video
+from .video_catalog import DEFAULT_CATALOG, read_text_catalog
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    row INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    folded_title TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    flagged INTEGER NOT NULL DEFAULT 0,
+    flag_reason TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS video_tags (
+    folded_tag TEXT NOT NULL,
+    row INTEGER NOT NULL REFERENCES videos(row),
+    PRIMARY KEY (folded_tag, row)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS videos_by_title ON videos (title, row);
+CREATE VIRTUAL TABLE IF NOT EXISTS video_titles USING fts5(
+    folded_title, content='videos', content_rowid='row', tokenize='trigram'
+);
+"""
+
+_COLUMNS = (
+    "videos.row, videos.title, videos.video_id, videos.tags, "
+    "videos.flagged, videos.flag_reason"
+)
+
+# Title order, ties in catalog order. SQLite's default BINARY collation
+# compares UTF-8 bytes, which orders strings like Python does; it is
+# served by the videos_by_title index.
+_TITLE_ORDER = "videos.title, videos.row"
+
+# Random row draws tried before random_video falls back to a scan.
+_RANDOM_DRAWS = 8
+
+# The trigram tokenizer cannot match terms shorter than this.
+_TRIGRAM_SIZE = 3
+
+
+class SqliteVideoLibrary(LibraryBackend):
+    """A video library kept in a SQLite database.
+
+    Only the rows a query touches are read, so the catalog does not need to
+    fit in memory: titles are searched through an FTS5 trigram index, tags
+    through an indexed (folded tag, row) table, and flag state is a column.
+    """
+
+    def __init__(self, catalog_path=None, database=":memory:"):
+        """The SqliteVideoLibrary class is initialized.
+
+        Args:
+            catalog_path: Text catalog imported when the database holds no
+                videos yet. Defaults to the bundled videos.txt.
+            database: Path of the SQLite database, ":memory:" for a
+                temporary one.
+        """
+        super().__init__()
+        self._connection = sqlite3.connect(database)
+        self._connection.executescript(_SCHEMA)
+        # Videos handed out and still referenced, by row, so that every
+        # caller sees the same object and its flag state.
+        self._materialized = weakref.WeakValueDictionary()
+        # Indexes of title and tag words, built on first use.
+        self._fuzzy_index = None
+        self._suggestions = None
+        self._relevance = None
+        if not self._connection.execute("SELECT 1 FROM videos LIMIT 1").fetchone():
+            self._import(catalog_path or DEFAULT_CATALOG)
+
+    def _import(self, catalog_path):
+        """Loads a text catalog into the empty database."""
+        with self._connection:
+            # A repeated id replaces the earlier entry but keeps its row.
+            self._connection.executemany(
+                "INSERT INTO videos (title, folded_title, video_id, tags) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (video_id) DO UPDATE SET "
+                "title = excluded.title, folded_title = excluded.folded_title, "
+                "tags = excluded.tags",
+                (
+                    (title, title.casefold(), video_id, ",".join(tags))
+                    for title, video_id, tags in read_text_catalog(catalog_path)
+                ),
+            )
+            self._connection.execute(
+                "INSERT INTO video_titles (video_titles) VALUES ('rebuild')")
+            # Read through a cursor of its own, so the rows are streamed
+            # rather than fetched into memory at once.
+            rows = self._connection.cursor()
+            rows.execute("SELECT row, tags FROM videos")
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO video_tags (folded_tag, row) VALUES (?, ?)",
+                (
+                    (tag.casefold(), row)
+                    for row, tags in rows
+                    if tags
+                    for tag in tags.split(",")
+                ),
+            )
+
+    def close(self):
+        """Closes the database connection."""
+        self._connection.close()
+
+    def _video(self, row, title, video_id, tags, flagged, flag_reason):
+        """Returns the Video for a fetched row."""
+        video = self._materialized.get(row)
+        if video is None:
+            video = Video(title, video_id, tags.split(",") if tags else [])
+            if flagged:
+                video.flag(flag_reason)
+            self._materialized[row] = video
+        return video
+
+    def _videos(self, query, parameters=()):
+        """Runs a query selecting _COLUMNS and returns the Videos."""
+        return [
+            self._video(*fields)
+            for fields in self._connection.execute(query, parameters)
+        ]
+
+    def __len__(self):
+        (count,) = self._connection.execute("SELECT count(*) FROM videos").fetchone()
+        return count
+
+    def get_all_videos(self):
+        return self._videos(
+            "SELECT {} FROM videos ORDER BY {}".format(_COLUMNS, _TITLE_ORDER))
+
+    def get_video(self, video_id):
+        videos = self._videos(
+            "SELECT {} FROM videos WHERE video_id = ?".format(_COLUMNS),
+            (video_id,))
+        return videos[0] if videos else None
+
+    def handle_of(self, video_id):
+        row = self._connection.execute(
+            "SELECT row FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return row[0] if row else None
+
+    def video_by_handle(self, handle):
+        video = self._materialized.get(handle)
+        if video is None:
+            (video,) = self._videos(
+                "SELECT {} FROM videos WHERE row = ?".format(_COLUMNS), (handle,))
+        return video
+
+    def get_videos_with_tag(self, video_tag):
+        return self._videos(
+            "SELECT {} FROM video_tags JOIN videos USING (row) "
+            "WHERE folded_tag = ? AND flagged = 0 ORDER BY {}".format(
+                _COLUMNS, _TITLE_ORDER),
+            (video_tag.casefold(),))
+
+    def search_titles(self, search_term, limit=None, offset=0):
+        return self.query_videos(TitleTerm(search_term), limit, offset)
+
+    def _query_rows(self, query):
+        """Compiles a search query into a SELECT of the matching rows.
+
+        Returns:
+            The SQL and its parameters.
+        """
+        if isinstance(query, TagTerm):
+            return ("SELECT row FROM video_tags WHERE folded_tag = ?",
+                    [query.tag.casefold()])
+        if isinstance(query, TitleTerm):
+            folded_term = query.text.casefold()
+            # Titles are indexed and compared case-folded the way Python
+            # folds them, which may change their length ("ß" -> "ss").
+            if len(folded_term) < _TRIGRAM_SIZE:
+                return ("SELECT row FROM videos WHERE instr(folded_title, ?)",
+                        [folded_term])
+            return ("SELECT row FROM videos WHERE row IN ("
+                    "SELECT rowid FROM video_titles WHERE video_titles MATCH ?) "
+                    "AND instr(folded_title, ?)",
+                    ['"{}"'.format(folded_term.replace('"', '""')), folded_term])
+        if isinstance(query, OrQuery):
+            parts = [self._query_rows(part) for part in query.parts]
+            return (
+                " UNION ".join("SELECT row FROM ({})".format(sql) for sql, _ in parts),
+                [value for _, values in parts for value in values],
+            )
+        # An AND, or a lone NOT: intersect the plain parts (or start from
+        # every row if there are none) and take away the negated ones.
+        # SQLite applies compound operators left to right.
+        parts = query.parts if isinstance(query, AndQuery) else [query]
+        selected = [self._query_rows(part) for part in parts
+                    if not isinstance(part, NotQuery)]
+        negated = [self._query_rows(part.part) for part in parts
+                   if isinstance(part, NotQuery)]
+        if not selected:
+            selected = [("SELECT row FROM videos", [])]
+        sql = " INTERSECT ".join(
+            "SELECT row FROM ({})".format(part) for part, _ in selected)
+        sql += "".join(
+            " EXCEPT SELECT row FROM ({})".format(part) for part, _ in negated)
+        return sql, [value for _, values in selected + negated for value in values]
+
+    def query_videos(self, query, limit=None, offset=0):
+        rows, parameters = self._query_rows(query)
+        # A negative LIMIT means no limit in SQLite.
+        return self._videos(
+            "SELECT {} FROM videos WHERE flagged = 0 AND row IN ({}) "
+            "ORDER BY {} LIMIT ? OFFSET ?".format(_COLUMNS, rows, _TITLE_ORDER),
+            parameters + [-1 if limit is None else limit, offset])
+
+    def _records(self):
+        """Yields a (row, title, tags) tuple per video."""
+        for row, title, tags in self._connection.execute(
+                "SELECT row, title, tags FROM videos"):
+            yield row, title, tags.split(",") if tags else []
+
+    def ranked_search(self, search_term, limit=10, offset=0):
+        if self._relevance is None:
+            self._relevance = Bm25Index(self._records())
+        best = self._relevance.search(
+            search_term,
+            offset + limit,
+            lambda row: not self.video_by_handle(row).flagged)
+        return [self.video_by_handle(row) for _, row in best[offset:]]
+
+    def _words(self):
+        """Returns the FuzzyIndex of title and tag words, building it first
+        if needed."""
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyIndex(self._records())
+        return self._fuzzy_index
+
+    def suggest(self, prefix, limit):
+        if self._suggestions is None:
+            self._suggestions = PrefixTrie(completion_counts(self._records()))
+        return self._suggestions.complete(word_prefix(prefix), limit)
+
+    def fuzzy_search(self, search_term, limit=None, offset=0):
+        distances = self._words().search(search_term)
+        videos = [self.video_by_handle(row) for row in distances]
+        ranked = sorted(
+            (distances[row], video.title, row, video)
+            for row, video in zip(distances, videos) if not video.flagged)
+        stop = None if limit is None else offset + limit
+        return [video for _, _, _, video in ranked[offset:stop]]
+
+    def get_flagged_videos(self):
+        return self._videos(
+            "SELECT {} FROM videos WHERE flagged = 1 ORDER BY {}".format(
+                _COLUMNS, _TITLE_ORDER))
+
+    def random_video(self, rng=random):
+        # Rows are numbered 1..max(row) without gaps, so a uniform row that
+        # turns out to be unflagged is a uniform pick among the unflagged
+        # videos. Only when most videos are flagged do the draws keep
+        # missing; then pick by offset among the unflagged rows instead.
+        (last_row,) = self._connection.execute(
+            "SELECT max(row) FROM videos").fetchone()
+        if last_row is None:
+            return None
+        for _ in range(_RANDOM_DRAWS):
+            videos = self._videos(
+                "SELECT {} FROM videos WHERE row = ? AND flagged = 0".format(
+                    _COLUMNS),
+                (rng.randrange(last_row) + 1,))
+            if videos:
+                return videos[0]
+        (playable,) = self._connection.execute(
+            "SELECT count(*) FROM videos WHERE flagged = 0").fetchone()
+        if not playable:
+            return None
+        videos = self._videos(
+            "SELECT {} FROM videos WHERE flagged = 0 ORDER BY row "
+            "LIMIT 1 OFFSET ?".format(_COLUMNS),
+            (rng.randrange(playable),))
+        return videos[0]
+
+    def _set_flag(self, video_id, flagged, reason):
+        """Updates the flag of a video, in the database and in memory."""
+        video = self.get_video(video_id)
+        if video is None or video.flagged == flagged:
+            return video
+        with self._connection:
+            self._connection.execute(
+                "UPDATE videos SET flagged = ?, flag_reason = ? WHERE video_id = ?",
+                (int(flagged), reason, video_id))
+        if flagged:
+            video.flag(reason)
+        else:
+            video.allow()
+        self._notify_listeners(self.handle_of(video_id))
+        return video
+
+    def flag_video(self, video_id, reason=""):
+        return self._set_flag(video_id, True, reason)
+
+    def allow_video(self, video_id):
+        return self._set_flag(video_id, False, "")
@@ -0,0 +1,59 @@
+"""A tag dictionary class."""
+
+from array import array
+
+
+class TagDictionary:
+    """Interns tags and numbers them, together with their case-folded forms.
+
+    Every distinct tag gets a small integer tag id and is stored once, so
+    videos can share one string instance per tag. Every distinct case-folded
+    tag gets a folded id, computed once at intern time; two tags that only
+    differ in case share a folded id, so case-insensitive tag comparisons
+    become integer comparisons.
+    """
+
+    def __init__(self):
+        """The TagDictionary class is initialized."""
+        self._names = []
+        self._ids = {}
+        self._folded_of = array("I")
+        self._folded_names = []
+        self._folded_ids = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, tag):
+        """Returns the tag id of tag, adding it to the dictionary if needed."""
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            folded = tag.casefold()
+            folded_id = self._folded_ids.get(folded)
+            if folded_id is None:
+                folded_id = self._folded_ids[folded] = len(self._folded_names)
+                self._folded_names.append(folded)
+            tag_id = self._ids[tag] = len(self._names)
+            self._names.append(tag)
+            self._folded_of.append(folded_id)
+        return tag_id
+
+    def canonical(self, tag):
+        """Returns the shared instance of tag."""
+        return self._names[self.intern(tag)]
+
+    def name(self, tag_id):
+        """Returns the tag with the given tag id."""
+        return self._names[tag_id]
+
+    def folded_id(self, tag_id):
+        """Returns the folded id of the tag with the given tag id."""
+        return self._folded_of[tag_id]
+
+    def folded_name(self, folded_id):
+        """Returns the case-folded tag with the given folded id."""
+        return self._folded_names[folded_id]
+
+    def lookup_folded(self, tag):
+        """Returns the folded id matching tag in any case, or None."""
+        return self._folded_ids.get(tag.casefold())
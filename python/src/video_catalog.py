@@ -0,0 +1,269 @@
+"""Readers and writers for the video catalog formats.
+
+Two formats are supported:
+
+* the pipe-delimited text catalog (``videos.txt``), one video per line
+  as ``title | video_id | tag, tag``;
+* a compiled binary catalog, produced from the text one with
+  ``compile_catalog`` (or ``python3 -m src.video_catalog SRC DST``).
+
+The compiled layout is::
+
+    magic                 8 bytes, b"YTCAT01\\0"
+    record count N        uint64
+    field offsets         (3 * N + 1) x uint64, into the string blob
+    id order              N x uint64, record numbers sorted by video id
+    string blob           UTF-8 title, video_id and comma-joined tags
+                          of every record, back to back
+
+All integers are little-endian. ``CompiledCatalog`` opens the file with
+``mmap`` and decodes single records on demand, so opening a catalog
+costs the same regardless of its size.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import csv
+import io
+import locale
+import mmap
+import os
+import struct
+import sys
+
+
+# Catalog loaded when no other one is given.
+DEFAULT_CATALOG = Path(__file__).parent / "videos.txt"
+
+_MAGIC = b"YTCAT01\0"
+_COUNT = struct.Struct("<Q")
+_OFFSET = struct.Struct("<Q")
+_FIELDS_PER_RECORD = 3
+
+
+# Helper Wrapper around CSV reader to strip whitespace from around
+# each item.
+def _csv_reader_with_strip(reader):
+    yield from ((item.strip() for item in line) for line in reader)
+
+
+def read_text_catalog(path):
+    """Parses a pipe-delimited text catalog.
+
+    Args:
+        path: Path of the text catalog.
+
+    Yields:
+        A (title, video_id, tags) tuple per line, tags being a list.
+    """
+    with open(path) as video_file:
+        yield from _parse_lines(video_file)
+
+
+def _parse_lines(video_file):
+    """Parses the pipe-delimited lines of an open text file."""
+    reader = _csv_reader_with_strip(csv.reader(video_file, delimiter="|"))
+    for video_info in reader:
+        title, url, tags = video_info
+        yield (
+            title,
+            url,
+            [tag.strip() for tag in tags.split(",")] if tags else [],
+        )
+
+
+def unique_records(records):
+    """Collapses records sharing a video id.
+
+    A repeated id replaces the earlier record but keeps its position, as it
+    does when a text catalog is loaded into a VideoLibrary.
+
+    Returns:
+        A list of (title, video_id, tags) tuples.
+    """
+    unique = {}
+    for title, video_id, tags in records:
+        unique[video_id] = (title, video_id, tags)
+    return list(unique.values())
+
+
+def _chunk_boundaries(path, chunks):
+    """Splits a file into up to `chunks` byte ranges ending on line breaks.
+
+    Returns:
+        A list of (start, end) byte offsets covering the whole file.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as video_file:
+        for chunk in range(1, chunks):
+            position = max(size * chunk // chunks, boundaries[-1])
+            video_file.seek(position)
+            # Move to the start of the next line.
+            video_file.readline()
+            position = min(video_file.tell(), size)
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _parse_chunk(path, start, end):
+    """Parses the lines in the byte range [start, end) of a text catalog.
+
+    Runs in a worker process, so it returns a plain list of records.
+    """
+    with open(path, "rb") as video_file:
+        video_file.seek(start)
+        data = video_file.read(end - start)
+    text = io.TextIOWrapper(
+        io.BytesIO(data), encoding=locale.getpreferredencoding(False))
+    return list(_parse_lines(text))
+
+
+def read_text_catalog_parallel(path, workers):
+    """Parses a text catalog with a pool of worker processes.
+
+    The file is split into byte ranges at line boundaries, each range is
+    parsed in a worker, and the records are yielded back in file order, so
+    the result is the same as read_text_catalog's. Quoted fields spanning
+    several lines are not supported.
+
+    Args:
+        path: Path of the text catalog.
+        workers: Number of worker processes.
+
+    Yields:
+        A (title, video_id, tags) tuple per line, tags being a list.
+    """
+    ranges = _chunk_boundaries(path, workers)
+    if len(ranges) <= 1:
+        yield from read_text_catalog(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        starts, ends = zip(*ranges)
+        for records in executor.map(
+                _parse_chunk, [path] * len(ranges), starts, ends):
+            yield from records
+
+
+def is_compiled_catalog(path):
+    """Returns whether the file at path is a compiled catalog."""
+    with open(path, "rb") as catalog_file:
+        return catalog_file.read(len(_MAGIC)) == _MAGIC
+
+
+def compile_catalog(source_path, target_path):
+    """Compiles a text catalog into the binary catalog format.
+
+    Args:
+        source_path: Path of the text catalog to read.
+        target_path: Path the compiled catalog is written to.
+
+    Returns:
+        The number of records written.
+    """
+    blob = bytearray()
+    offsets = [0]
+    ids = []
+    for title, video_id, tags in unique_records(read_text_catalog(source_path)):
+        encoded_id = video_id.encode()
+        for field in (title.encode(), encoded_id, ",".join(tags).encode()):
+            blob += field
+            offsets.append(len(blob))
+        ids.append(encoded_id)
+
+    id_order = sorted(range(len(ids)), key=ids.__getitem__)
+    with open(target_path, "wb") as target:
+        target.write(_MAGIC)
+        target.write(_COUNT.pack(len(ids)))
+        target.write(struct.pack("<%dQ" % len(offsets), *offsets))
+        target.write(struct.pack("<%dQ" % len(id_order), *id_order))
+        target.write(blob)
+    return len(ids)
+
+
+class CompiledCatalog:
+    """A read-only, memory-mapped view of a compiled catalog."""
+
+    def __init__(self, path):
+        """Maps the compiled catalog at path into memory.
+
+        Raises:
+            ValueError: If the file is not a compiled catalog.
+        """
+        with open(path, "rb") as catalog_file:
+            self._map = mmap.mmap(catalog_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            self._map.close()
+            raise ValueError("{} is not a compiled video catalog".format(path))
+        (self._count,) = _COUNT.unpack_from(self._map, len(_MAGIC))
+        self._offsets_start = len(_MAGIC) + _COUNT.size
+        self._order_start = (
+            self._offsets_start
+            + (_FIELDS_PER_RECORD * self._count + 1) * _OFFSET.size
+        )
+        self._blob_start = self._order_start + self._count * _OFFSET.size
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """Unmaps the catalog."""
+        self._map.close()
+
+    def _field(self, row, field):
+        """Returns the raw bytes of one field of a record."""
+        position = self._offsets_start + (
+            _FIELDS_PER_RECORD * row + field) * _OFFSET.size
+        start, end = struct.unpack_from("<2Q", self._map, position)
+        return self._map[self._blob_start + start:self._blob_start + end]
+
+    def video_id(self, row):
+        """Returns the video id of the record at row."""
+        return self._field(row, 1).decode()
+
+    def record(self, row):
+        """Decodes a record.
+
+        Args:
+            row: The record number, in source order.
+
+        Returns:
+            A (title, video_id, tags) tuple, tags being a tuple.
+        """
+        tags = self._field(row, 2).decode()
+        return (
+            self._field(row, 0).decode(),
+            self._field(row, 1).decode(),
+            tuple(tags.split(",")) if tags else (),
+        )
+
+    def find(self, video_id):
+        """Returns the record number for video_id, or None.
+
+        Binary searches the id order table, decoding O(log n) ids.
+        """
+        target = video_id.encode()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            (row,) = _OFFSET.unpack_from(
+                self._map, self._order_start + middle * _OFFSET.size)
+            current = self._field(row, 1)
+            if current < target:
+                low = middle + 1
+            elif current > target:
+                high = middle
+            else:
+                return row
+        return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 -m src.video_catalog <videos.txt> <catalog.ytc>")
+        sys.exit(1)
+    count = compile_catalog(Path(sys.argv[1]), Path(sys.argv[2]))
+    print("Compiled {} videos into {}".format(count, sys.argv[2]))
@@ -1,35 +1,261 @@
 """A video library class."""
 
-from .video import Video
-from pathlib import Path
-import csv
-
-
-# Helper Wrapper around CSV reader to strip whitespace from around
-# each item.
-def _csv_reader_with_strip(reader):
-    yield from ((item.strip() for item in line) for line in reader)
-
-
-class VideoLibrary:
-    """A class used to represent a Video Library."""
-
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
-        self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+from .bm25_index import Bm25Index
+from .catalog_snapshot import load_snapshot, write_snapshot
+from .fuzzy_index import FuzzyIndex, completion_counts, word_prefix
+from .prefix_trie import PrefixTrie
+from .library_backend import LibraryBackend
+from .search_query import AndQuery, NotQuery, OrQuery, TagTerm, TitleTerm
+from .video_catalog import (
+    DEFAULT_CATALOG,
+    CompiledCatalog,
+    is_compiled_catalog,
+    read_text_catalog,
+    read_text_catalog_parallel,
+)
+from .tag_dictionary import TagDictionary
+from .video_store import ColumnarVideoStore, EagerVideoStore, LazyVideoStore
+from array import array
+from bisect import bisect_left
+import heapq
+import io
+import itertools
+import random
+
+
+# Storage engines a text catalog can be loaded into.
+STORAGE_ENGINES = {
+    "objects": EagerVideoStore,
+    "columnar": ColumnarVideoStore,
+}
+
+# Attributes holding the parsed and indexed catalog, as saved in snapshots.
+_SNAPSHOT_ATTRIBUTES = (
+    "_tags",
+    "_videos",
+    "_title_order",
+    "_title_ranks",
+    "_tag_index",
+    "_folded_titles",
+    "_folded_title_offsets",
+    "_title_index",
+    "_playable",
+    "_playable_positions",
+)
+
+# Length of the substrings kept in the title index.
+_NGRAM_SIZE = 3
+
+
+def _ngrams(text):
+    """Returns the set of distinct n-grams of text."""
+    return {text[i:i + _NGRAM_SIZE] for i in range(len(text) - _NGRAM_SIZE + 1)}
+
+
+def _page(ranks, limit, offset):
+    """Returns the page of limit ranks (all if None) after the first offset
+    ones, reading no further into ranks than the page ends."""
+    stop = None if limit is None else offset + limit
+    return itertools.islice(ranks, offset, stop)
+
+
+def _contains(postings, rank):
+    """Returns whether a sorted posting list contains rank."""
+    position = bisect_left(postings, rank)
+    return position < len(postings) and postings[position] == rank
+
+
+class VideoLibrary(LibraryBackend):
+    """A class used to represent a Video Library, held in memory."""
+
+    def __init__(
+        self, catalog_path=None, workers=None, storage="objects", snapshot=True
+    ):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            catalog_path: Path of the catalog to load, either a text catalog
+                or one compiled with video_catalog.compile_catalog. Defaults
+                to the bundled videos.txt.
+            workers: Number of processes used to parse a text catalog.
+                None or 1 parses it in this process.
+            storage: Storage engine for a text catalog, a key of
+                STORAGE_ENGINES. "objects" keeps a Video per entry,
+                "columnar" keeps flat arrays and builds Video views on
+                demand.
+            snapshot: Whether to keep a snapshot of the parsed and indexed
+                text catalog next to it (see catalog_snapshot), and to load
+                from it instead of parsing while it is still valid.
+
+        A text catalog is parsed and indexed up front. A compiled catalog is
+        memory-mapped instead: videos are only built when they are looked
+        up, and the search indexes are built on the first search.
+        """
+        super().__init__()
+        catalog_path = catalog_path or DEFAULT_CATALOG
+        # Every distinct tag is interned once and numbered; the tag index
+        # is keyed by case-folded tag id.
+        self._tags = TagDictionary()
+        # Rows in title order (ties kept in catalog order, as a stable sort
+        # of the videos would), and the rank of each row in that order.
+        # Posting lists hold ranks, so they read out already sorted.
+        self._title_order = array("Q")
+        self._title_ranks = array("Q")
+        # Case-folded tag id -> sorted ranks of the unflagged videos
+        # carrying that tag. Flag and allow remove and re-insert a single
+        # rank by bisection.
+        self._tag_index = {}
+        # Case-folded titles of every row, concatenated into one string
+        # addressed by an offset array rather than kept as a string object
+        # per row, and trigram -> sorted ranks of the videos whose folded
+        # title contains that trigram.
+        self._folded_titles = ""
+        self._folded_title_offsets = array("Q", [0])
+        self._title_index = {}
+        # Rows of the unflagged videos, densely packed, and the position of
+        # each row in it (-1 when flagged): flag swap-removes a row, allow
+        # appends it, and a random pick is a single index.
+        self._playable = array("Q")
+        self._playable_positions = array("q")
+        # Rows flagged since the catalog was loaded; a freshly loaded
+        # catalog has none, so this is not part of the snapshot.
+        self._flagged_rows = set()
+        self._indexed = False
+        # The FuzzyIndex, PrefixTrie and Bm25Index over title and tag
+        # words, built on first use since most sessions never need them.
+        self._fuzzy_index = None
+        self._suggestions = None
+        self._relevance = None
+
+        if is_compiled_catalog(catalog_path):
+            self._videos = LazyVideoStore(
+                CompiledCatalog(catalog_path), self._tags)
+            return
+
+        if storage not in STORAGE_ENGINES:
+            raise ValueError("Unknown storage engine: {}".format(storage))
+        state = load_snapshot(catalog_path, storage) if snapshot else None
+        if state is not None:
+            for attribute in _SNAPSHOT_ATTRIBUTES:
+                setattr(self, attribute, state[attribute])
+            self._indexed = True
+            return
+
+        if workers and workers > 1:
+            records = read_text_catalog_parallel(catalog_path, workers)
+        else:
+            records = read_text_catalog(catalog_path)
+        self._videos = STORAGE_ENGINES[storage](records, self._tags)
+        self._build_indexes()
+        if snapshot:
+            write_snapshot(catalog_path, storage, {
+                attribute: getattr(self, attribute)
+                for attribute in _SNAPSHOT_ATTRIBUTES
+            })
+
+    def _build_indexes(self):
+        """Builds the title order and the tag and title indexes."""
+        titles = []
+        row_tags = []
+        for _, title, _, tags in self._videos.records():
+            titles.append(title)
+            row_tags.append(tags)
+
+        self._title_order = array(
+            "Q", sorted(range(len(titles)), key=titles.__getitem__))
+        self._title_ranks = array("Q", bytes(8 * len(titles)))
+        for rank, row in enumerate(self._title_order):
+            self._title_ranks[row] = rank
+        folded_titles = io.StringIO()
+        for title in titles:
+            folded_title = title.casefold()
+            folded_titles.write(folded_title)
+            self._folded_title_offsets.append(
+                self._folded_title_offsets[-1] + len(folded_title))
+        self._folded_titles = folded_titles.getvalue()
+
+        # Visiting rows in title order appends every rank in sorted order.
+        for rank, row in enumerate(self._title_order):
+            if not self._videos.is_flagged(row):
+                for folded_id in self._folded_tag_ids(row_tags[row]):
+                    self._tag_index.setdefault(folded_id, array("Q")).append(rank)
+            for ngram in _ngrams(self._folded_title(row)):
+                self._title_index.setdefault(ngram, array("Q")).append(rank)
+
+        self._playable_positions = array("q", [-1]) * len(titles)
+        for row in range(len(titles)):
+            if not self._videos.is_flagged(row):
+                self._add_playable(row)
+        self._indexed = True
+
+    def _folded_title(self, row):
+        """Returns the case-folded title of row."""
+        return self._folded_titles[
+            self._folded_title_offsets[row]:self._folded_title_offsets[row + 1]]
+
+    def _title_contains(self, rank, folded_term):
+        """Returns whether the folded title at a title rank contains
+        folded_term, without copying the title out of the arena."""
+        row = self._title_order[rank]
+        return self._folded_titles.find(
+            folded_term,
+            self._folded_title_offsets[row],
+            self._folded_title_offsets[row + 1],
+        ) >= 0
+
+    def _ensure_indexes(self):
+        """Builds the indexes if they have not been built yet."""
+        if not self._indexed:
+            self._build_indexes()
+
+    def _folded_tag_ids(self, tags):
+        """Returns the distinct folded tag ids of a list of tags."""
+        return {self._tags.folded_id(self._tags.intern(tag)) for tag in tags}
+
+    def _index_tags(self, row, tags):
+        """Adds the row to the posting list of each of its tags."""
+        rank = self._title_ranks[row]
+        for folded_id in self._folded_tag_ids(tags):
+            postings = self._tag_index.setdefault(folded_id, array("Q"))
+            position = bisect_left(postings, rank)
+            if position == len(postings) or postings[position] != rank:
+                postings.insert(position, rank)
+
+    def _unindex_tags(self, row, tags):
+        """Removes the row from the posting list of each of its tags."""
+        rank = self._title_ranks[row]
+        for folded_id in self._folded_tag_ids(tags):
+            postings = self._tag_index.get(folded_id, ())
+            position = bisect_left(postings, rank)
+            if position < len(postings) and postings[position] == rank:
+                del postings[position]
+
+    def _add_playable(self, row):
+        """Appends a row to the playable set."""
+        self._playable_positions[row] = len(self._playable)
+        self._playable.append(row)
+
+    def _remove_playable(self, row):
+        """Removes a row from the playable set by swapping in the last one."""
+        position = self._playable_positions[row]
+        last = self._playable.pop()
+        if last != row:
+            self._playable[position] = last
+            self._playable_positions[last] = position
+        self._playable_positions[row] = -1
+
+    def _videos_at_ranks(self, ranks):
+        """Returns the videos at the given title ranks."""
+        return [self._videos.video_at(self._title_order[rank]) for rank in ranks]
+
+    def __len__(self):
+        return len(self._videos)
 
     def get_all_videos(self):
-        """Returns all available video information from the video library."""
-        return list(self._videos.values())
+        """Returns all available video information from the video library,
+        sorted by title."""
+        self._ensure_indexes()
+        return [self._videos.video_at(row) for row in self._title_order]
 
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
@@ -42,3 +268,313 @@ class VideoLibrary:
             does not exist.
         """
         return self._videos.get(video_id, None)
+
+    def handle_of(self, video_id):
+        """Returns the integer handle (store row) of a video, or None."""
+        return self._videos.row_of(video_id)
+
+    def video_by_handle(self, handle):
+        """Returns the Video with the given handle."""
+        return self._videos.video_at(handle)
+
+    def get_videos_with_tag(self, video_tag):
+        """Returns the unflagged videos carrying the given tag.
+
+        The lookup is case-insensitive and answered from the tag index, so
+        its cost is proportional to the number of matches.
+
+        Args:
+            video_tag: The tag to look up, e.g. "#cat".
+
+        Returns:
+            A list of the matching Video objects, sorted by title.
+        """
+        self._ensure_indexes()
+        ranks = self._tag_index.get(self._tags.lookup_folded(video_tag), ())
+        return self._videos_at_ranks(ranks)
+
+    def search_titles(self, search_term, limit=None, offset=0):
+        """Returns the unflagged videos whose title contains search_term.
+
+        The match is a case-insensitive substring match. Terms of at least
+        three characters walk the rarest of their trigrams' posting lists and
+        only check the titles found on every other trigram's list as well;
+        shorter terms check every title. Titles are checked in title order
+        and the search stops once the requested page is full.
+
+        Args:
+            search_term: The substring to look for.
+            limit: The most videos to return, None for all of them.
+            offset: The number of matches to skip first.
+
+        Returns:
+            A list of the matching Video objects, sorted by title.
+        """
+        self._ensure_indexes()
+        return self._videos_at_ranks(
+            _page(self._ranks(TitleTerm(search_term)), limit, offset))
+
+    def query_videos(self, query, limit=None, offset=0):
+        """Returns the unflagged videos selected by a boolean search query.
+
+        The cheapest part of every AND, by posting list length, is read
+        and the other parts are only checked for the ranks it yields, so
+        the smallest posting lists drive the intersection. NOT parts are
+        checked, never read, unless nothing else bounds the result.
+
+        Ranks are produced lazily in title order, so only as much of the
+        query is evaluated as the requested page needs.
+
+        Args:
+            query: A query built by search_query.parse_search_query.
+            limit: The most videos to return, None for all of them.
+            offset: The number of matches to skip first.
+
+        Returns:
+            A list of the matching Video objects, sorted by title.
+        """
+        self._ensure_indexes()
+        return self._videos_at_ranks(_page(self._ranks(query), limit, offset))
+
+    def fuzzy_search(self, search_term, limit=None, offset=0):
+        """Returns the unflagged videos matching search_term up to typos.
+
+        Every word of the term must be within a few edits of a word of the
+        video's title or tags. Matches are found through a BK-tree over the
+        distinct words, not by comparing the term with every title.
+
+        Args:
+            search_term: The words to look for.
+            limit: The most videos to return, None for all of them.
+            offset: The number of matches to skip first.
+
+        Returns:
+            A list of the matching Video objects, fewest typos first, ties
+            sorted by title.
+        """
+        self._ensure_indexes()
+        ranked = sorted(
+            (distance, self._title_ranks[row])
+            for row, distance in self._words().search(search_term).items()
+            if self._playable_positions[row] >= 0
+        )
+        return self._videos_at_ranks(
+            _page((rank for _, rank in ranked), limit, offset))
+
+    def ranked_search(self, search_term, limit=10, offset=0):
+        """Returns the unflagged videos most relevant to search_term.
+
+        Videos are scored by BM25 over the words of their titles and tags,
+        and the best offset + limit are picked with a heap rather than by
+        sorting every match.
+
+        Args:
+            search_term: The words to look for.
+            limit: The most videos to return.
+            offset: The number of best matches to skip first.
+
+        Returns:
+            A list of Video objects, most relevant first.
+        """
+        if self._relevance is None:
+            self._relevance = Bm25Index(
+                (row, title, tags) for row, title, _, tags in self._videos.records()
+            )
+        self._ensure_indexes()
+        best = self._relevance.search(
+            search_term,
+            offset + limit,
+            lambda row: self._playable_positions[row] >= 0,
+        )
+        return [self._videos.video_at(row) for _, row in best[offset:]]
+
+    def suggest(self, prefix, limit):
+        """Returns title words or tags completing a prefix.
+
+        Args:
+            prefix: The start of a word, in any case; with a leading #,
+                the start of a tag.
+            limit: The most words to return, at most
+                prefix_trie.MAX_COMPLETIONS.
+
+        Returns:
+            A list of words and #tags, used by the most videos first.
+        """
+        if self._suggestions is None:
+            self._suggestions = PrefixTrie(completion_counts(
+                (row, title, tags) for row, title, _, tags in self._videos.records()
+            ))
+        return self._suggestions.complete(word_prefix(prefix), limit)
+
+    def _words(self):
+        """Returns the FuzzyIndex of title and tag words, building it first
+        if needed."""
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyIndex(
+                (row, title, tags) for row, title, _, tags in self._videos.records()
+            )
+        return self._fuzzy_index
+
+    def _is_playable_rank(self, rank):
+        """Returns whether the video at a title rank is unflagged."""
+        return self._playable_positions[self._title_order[rank]] >= 0
+
+    def _title_postings(self, folded_term):
+        """Returns the posting lists of the trigrams of folded_term, shortest
+        first, or None if the term is too short to have any."""
+        if len(folded_term) < _NGRAM_SIZE:
+            return None
+        return sorted(
+            (self._title_index.get(ngram, ()) for ngram in _ngrams(folded_term)),
+            key=len,
+        )
+
+    def _title_candidates(self, folded_term):
+        """Yields, in increasing order, ranks including every title
+        containing folded_term.
+
+        The shortest trigram posting list is read and each of its ranks is
+        looked up in the other lists, rarest first, so a rank missing a
+        trigram is dropped without its title being compared.
+        """
+        postings = self._title_postings(folded_term)
+        if postings is None:
+            yield from range(len(self._title_order))
+            return
+        driver, others = postings[0], postings[1:]
+        for rank in driver:
+            if all(_contains(other, rank) for other in others):
+                yield rank
+
+    def _estimate(self, query):
+        """Returns an upper bound on the number of ranks a query yields."""
+        if isinstance(query, TagTerm):
+            return len(self._tag_index.get(self._tags.lookup_folded(query.tag), ()))
+        if isinstance(query, TitleTerm):
+            postings = self._title_postings(query.text.casefold())
+            return len(self._title_order if postings is None else postings[0])
+        if isinstance(query, OrQuery):
+            return sum(self._estimate(part) for part in query.parts)
+        if isinstance(query, AndQuery):
+            return min(
+                (self._estimate(part) for part in query.parts
+                 if not isinstance(part, NotQuery)),
+                default=len(self._playable),
+            )
+        return len(self._playable)
+
+    def _ranks(self, query):
+        """Yields the title ranks of the unflagged videos a query selects,
+        in increasing order."""
+        if isinstance(query, TagTerm):
+            yield from self._tag_index.get(self._tags.lookup_folded(query.tag), ())
+        elif isinstance(query, TitleTerm):
+            folded_term = query.text.casefold()
+            for rank in self._title_candidates(folded_term):
+                if (self._title_contains(rank, folded_term)
+                        and self._is_playable_rank(rank)):
+                    yield rank
+        elif isinstance(query, OrQuery):
+            previous = None
+            for rank in heapq.merge(*(self._ranks(part) for part in query.parts)):
+                if rank != previous:
+                    yield rank
+                    previous = rank
+        else:
+            parts = query.parts if isinstance(query, AndQuery) else [query]
+            driver = min(
+                (part for part in parts if not isinstance(part, NotQuery)),
+                key=self._estimate,
+                default=None,
+            )
+            if driver is None:
+                # only negated parts: check every unflagged video
+                candidates = (
+                    rank for rank in range(len(self._title_order))
+                    if self._is_playable_rank(rank)
+                )
+            else:
+                candidates = self._ranks(driver)
+            checks = [part for part in parts if part is not driver]
+            checks.sort(key=self._estimate)
+            for rank in candidates:
+                if all(self._matches(part, rank) for part in checks):
+                    yield rank
+
+    def _matches(self, query, rank):
+        """Returns whether a query selects the unflagged video at rank."""
+        if isinstance(query, TagTerm):
+            return _contains(
+                self._tag_index.get(self._tags.lookup_folded(query.tag), ()), rank)
+        if isinstance(query, TitleTerm):
+            return self._title_contains(rank, query.text.casefold())
+        if isinstance(query, OrQuery):
+            return any(self._matches(part, rank) for part in query.parts)
+        if isinstance(query, AndQuery):
+            return all(self._matches(part, rank) for part in query.parts)
+        return not self._matches(query.part, rank)
+
+    def get_flagged_videos(self):
+        """Returns the flagged videos, sorted by title."""
+        self._ensure_indexes()
+        rows = sorted(self._flagged_rows, key=self._title_ranks.__getitem__)
+        return [self._videos.video_at(row) for row in rows]
+
+    def random_video(self, rng=random):
+        """Returns a random unflagged video, or None if there is none.
+
+        Args:
+            rng: The random.Random instance (or the random module) to draw
+                from.
+        """
+        self._ensure_indexes()
+        if not self._playable:
+            return None
+        row = self._playable[rng.randrange(len(self._playable))]
+        return self._videos.video_at(row)
+
+    def flag_video(self, video_id, reason=""):
+        """Flags a video and hides it from the tag index and playable set.
+
+        Args:
+            video_id: The video url.
+            reason: Why the video was flagged.
+
+        Returns:
+            The flagged Video object. None if the video does not exist.
+        """
+        row = self._videos.row_of(video_id)
+        if row is None:
+            return None
+        video = self._videos.video_at(row)
+        if not video.flagged:
+            video.flag(reason)
+            self._flagged_rows.add(row)
+            if self._indexed:
+                self._unindex_tags(row, video.tags)
+                self._remove_playable(row)
+            self._notify_listeners(row)
+        return video
+
+    def allow_video(self, video_id):
+        """Removes the flag from a video and restores it in the tag index
+        and playable set.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The allowed Video object. None if the video does not exist.
+        """
+        row = self._videos.row_of(video_id)
+        if row is None:
+            return None
+        video = self._videos.video_at(row)
+        if video.flagged:
+            video.allow()
+            self._flagged_rows.discard(row)
+            if self._indexed:
+                self._index_tags(row, video.tags)
+                self._add_playable(row)
+            self._notify_listeners(row)
+        return video
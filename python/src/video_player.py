@@ -1,32 +1,105 @@
 """A video player class."""
 
+from .sqlite_library import SqliteVideoLibrary
 from .video_library import VideoLibrary
+from .playlist_membership import PlaylistMembership
+from .search_cache import SearchCache
+from .search_query import parse_search_query
+from .smart_playlist import SmartPlaylist, VideoQuery
 from .video_playlist import Playlist
 import random
 from builtins import input
 
 
+# Library backends a VideoPlayer can be built on, by name.
+BACKENDS = {
+    "memory": VideoLibrary,
+    "sqlite": SqliteVideoLibrary,
+}
+
+
 class VideoPlayer:
     """A class used to represent a Video Player."""
 
-    def __init__(self):
-        self._video_library = VideoLibrary()
+    def __init__(
+        self, backend="memory", seed=None, playlist_store=None, **backend_options
+    ):
+        """The VideoPlayer class is initialized.
+
+        Args:
+            backend: Name of the library backend, a key of BACKENDS.
+            seed: Seed for the random number generator behind PLAY_RANDOM,
+                for reproducible runs. None seeds it from the system.
+            playlist_store: A PlaylistStore to load playlists from and
+                record playlist changes to. None keeps playlists in memory
+                only.
+            backend_options: Keyword arguments for the backend, e.g.
+                catalog_path, or database for the "sqlite" backend.
+        """
+        if backend not in BACKENDS:
+            raise ValueError("Unknown library backend: {}".format(backend))
+        self._video_library = BACKENDS[backend](**backend_options)
+        self._random = random.Random(seed)
+        # repeated searches are answered from here until a video they
+        # could select changes
+        self._search_cache = SearchCache(self._video_library)
+        # the offset and videos of the last search results displayed
+        self._last_results = (0, [])
         self._video_playing = False
         self._current_video = None
+        # playlists by their case-folded name, and the playlists
+        # containing each video
         self._playlists = {}
+        self._playlist_membership = PlaylistMembership()
+        self._playlist_store = playlist_store
+        if playlist_store is not None:
+            self._restore_playlists()
+
+    def _restore_playlists(self):
+        """Rebuilds the playlists saved in the playlist store."""
+        for playlist_name, video_ids in self._playlist_store.playlists():
+            playlist = self._new_playlist(playlist_name)
+            for video_id in video_ids:
+                video = self._video_library.get_video(video_id)
+                # videos that left the catalog are dropped
+                if video:
+                    playlist.add_video(video)
+            self._playlists[playlist_name.casefold()] = playlist
+        # smart playlists select their videos again from the catalog
+        for playlist_name, query_text in self._playlist_store.smart_playlists():
+            self._playlists[playlist_name.casefold()] = SmartPlaylist(
+                playlist_name,
+                self._video_library,
+                VideoQuery.parse(query_text.split()),
+                self._playlist_membership,
+            )
+
+    def _new_playlist(self, playlist_name):
+        """Returns an empty playlist tracked by the membership index."""
+        return Playlist(
+            playlist_name, self._video_library, self._playlist_membership
+        )
+
+    def _record(self, operation, playlist_name, *arguments):
+        """Records a playlist change in the playlist store, if any."""
+        if self._playlist_store is not None:
+            self._playlist_store.record(operation, playlist_name, *arguments)
+
+    def close(self):
+        """Saves any pending playlist changes."""
+        if self._playlist_store is not None:
+            self._playlist_store.close()
 
     def number_of_videos(self):
-        num_videos = len(self._video_library.get_all_videos())
+        num_videos = len(self._video_library)
         print(f"{num_videos} videos in the library")
 
     def show_all_videos(self):
         """Returns all videos."""
 
         print("Here's a list of all available videos:")
-        # A list of the videos as objects
+        # A list of the videos as objects, already in lexographical order
         videos = self._video_library.get_all_videos()
-        # sorting lin lexographical order
-        videos = sorted(videos)
 
         # printing for every video
         for video in videos:
@@ -96,21 +169,14 @@ class VideoPlayer:
     def play_random_video(self):
         """Plays a random video from the video library."""
 
-        # getting the list of videos
-        videos = self._video_library.get_all_videos()
-
-        # filtering out the flagged videos in the library
-        videos = [video for video in videos if video.flagged == False]
+        # getting a random video among the ones that are not flagged
+        video = self._video_library.random_video(self._random)
 
         # if there are no videos:
-        if len(videos) < 1:
+        if video is None:
             print("No videos available")
             return
 
-        # getting a random video from the list of videos
-        random_index = random.randrange(len(videos))
-        video = videos[random_index]
-
         # if the video exists:
         if video:
 
@@ -187,25 +253,64 @@ class VideoPlayer:
         """
 
         # normalising the playlist name to check for different cases:
-        norm_name = playlist_name.lower()
+        norm_name = playlist_name.casefold()
 
-        # for every playlist, check if the name already exits
-        for playlist in self._playlists.keys():
-            # if the name exists, we inform and return
-            if playlist.lower() == norm_name:
-                print(
-                    "Cannot create playlist: A playlist with the same name already exists"
-                )
-                return
-
-        # create a playlist by the name
-        playlist = Playlist(playlist_name)
+        # if the name exists, we inform and return
+        if norm_name in self._playlists:
+            print(
+                "Cannot create playlist: A playlist with the same name already exists"
+            )
+            return
 
-        # add plalist to list of playlists
-        self._playlists[playlist_name] = playlist
+        # create a playlist by the name, and register it by its normalised
+        # name; the playlist keeps the name it was created with for display
+        self._playlists[norm_name] = self._new_playlist(playlist_name)
+        self._record("create", playlist_name)
 
         print("Successfully created new playlist: {}".format(playlist_name))
 
+    def create_smart_playlist(self, playlist_name, query_terms):
+        """Creates a playlist holding the videos selected by a query.
+
+        Args:
+            playlist_name: The playlist name.
+            query_terms: The terms of the query, see VideoQuery.
+        """
+
+        # the name is shared with ordinary playlists
+        if playlist_name.casefold() in self._playlists:
+            print(
+                "Cannot create playlist: A playlist with the same name already exists"
+            )
+            return
+
+        try:
+            query = VideoQuery.parse(query_terms)
+        except ValueError as error:
+            print("Cannot create playlist: Invalid query term {}".format(error))
+            return
+
+        # the videos are selected once here and kept up to date after that
+        playlist = SmartPlaylist(
+            playlist_name, self._video_library, query, self._playlist_membership
+        )
+        self._playlists[playlist_name.casefold()] = playlist
+        self._record("smart", playlist_name, str(query))
+
+        print(
+            "Successfully created new smart playlist: {} ({} videos)".format(
+                playlist_name, len(playlist)
+            )
+        )
+
+    def _find_playlist(self, playlist_name):
+        """Returns the playlist with a given name in any case, or None.
+
+        Args:
+            playlist_name: The playlist name.
+        """
+        return self._playlists.get(playlist_name.casefold())
+
     def add_to_playlist(self, playlist_name, video_id):
         """Adds a video to a playlist with a given name.
 
@@ -214,56 +319,158 @@ class VideoPlayer:
             video_id: The video_id to be added.
         """
 
-        # normalising the playlist name to check for different cases:
-        norm_name = playlist_name.lower()
+        # first check if play list doesn't exist
+        playlist = self._find_playlist(playlist_name)
+        if playlist is None:
+            print(
+                "Cannot add video to {}: Playlist does not exist".format(playlist_name)
+            )
+            return
+
+        # a smart playlist's videos are chosen by its query
+        if isinstance(playlist, SmartPlaylist):
+            print(
+                "Cannot add video to {}: Playlist is a smart playlist".format(
+                    playlist_name
+                )
+            )
+            return
+
+        video = self._video_library.get_video(video_id)
+
+        # if the video doesn't exist, we say so
+        if not video:
+            print("Cannot add video to {}: Video does not exist".format(playlist_name))
+
+        # check if the video is flagged
+        elif video.flagged:
+            print(
+                "Cannot add video to my_playlist: Video is currently flagged (reason: {})".format(
+                    video.flagged_reason
+                )
+            )
+
+        # check if the video exists in the playlist
+        elif playlist.get_video(video_id):
+            print("Cannot add video to {}: Video already added".format(playlist_name))
+
+        # it doesn't exist in the playlist so we add the video
+        else:
+            playlist.add_video(video)
+            self._record("add", playlist.get_name(), video_id)
+            print("Added video to {}: {}".format(playlist_name, video.title))
+
+    def insert_into_playlist(self, playlist_name, video_id, position):
+        """Inserts a video into a playlist with a given name at a position.
+
+        Args:
+            playlist_name: The playlist name.
+            video_id: The video_id to be inserted.
+            position: The 1-based position the video should end up at.
+        """
 
         # first check if play list doesn't exist
-        # for every playlist, check if the name already exits
-        for playlist_names in self._playlists.keys():
-            # if the name exists, we continue
-            if playlist_names.lower() == norm_name:
-                video = self._video_library.get_video(video_id)
-                playlist = self._playlists[playlist_names]
-                # if the video exists, we add to the list:
-                if video:
+        playlist = self._find_playlist(playlist_name)
+        if playlist is None:
+            print(
+                "Cannot add video to {}: Playlist does not exist".format(playlist_name)
+            )
+            return
 
-                    # check if the video is flagged
-                    if video.flagged:
-                        print(
-                            "Cannot add video to my_playlist: Video is currently flagged (reason: {})".format(
-                                video.flagged_reason
-                            )
-                        )
-
-                    # check if the video exists in the playlist
-                    elif playlist.get_video(video_id):
-                        print(
-                            "Cannot add video to {}: Video already added".format(
-                                playlist_name
-                            )
-                        )
-
-                    # it doesn't exist in the playlist so we add the video
-                    else:
-                        playlist.add_video(video)
-                        print(
-                            "Added video to {}: {}".format(playlist_name, video.title)
-                        )
-
-                    # return
-                    return
-                # other wise we say it doesn't exist
-                else:
-                    print(
-                        "Cannot add video to {}: Video does not exist".format(
-                            playlist_name
-                        )
-                    )
+        # a smart playlist's videos are chosen by its query
+        if isinstance(playlist, SmartPlaylist):
+            print(
+                "Cannot add video to {}: Playlist is a smart playlist".format(
+                    playlist_name
+                )
+            )
+            return
 
-                return
+        video = self._video_library.get_video(video_id)
+
+        # if the video doesn't exist, we say so
+        if not video:
+            print("Cannot add video to {}: Video does not exist".format(playlist_name))
 
-        # if it is out of the loop, it didn't find any playlist:
-        print("Cannot add video to {}: Playlist does not exist".format(playlist_name))
+        # check if the video is flagged
+        elif video.flagged:
+            print(
+                "Cannot add video to {}: Video is currently flagged (reason: {})".format(
+                    playlist_name, video.flagged_reason
+                )
+            )
+
+        # check if the video exists in the playlist
+        elif playlist.get_video(video_id):
+            print("Cannot add video to {}: Video already added".format(playlist_name))
+
+        # the position can be anywhere from the start to just after the end
+        elif not 1 <= position <= len(playlist) + 1:
+            print("Cannot add video to {}: Invalid position".format(playlist_name))
+
+        # otherwise we insert the video
+        else:
+            playlist.insert_video(video, position - 1)
+            self._record("insert", playlist.get_name(), video_id, position - 1)
+            print(
+                "Added video to {} at position {}: {}".format(
+                    playlist_name, position, video.title
+                )
+            )
+
+    def move_in_playlist(self, playlist_name, video_id, position):
+        """Moves a video of a playlist with a given name to a position.
+
+        Args:
+            playlist_name: The playlist name.
+            video_id: The video_id to be moved.
+            position: The 1-based position the video should end up at.
+        """
+
+        # first check if play list doesn't exist
+        playlist = self._find_playlist(playlist_name)
+        if playlist is None:
+            print(
+                "Cannot move video in {}: Playlist does not exist".format(playlist_name)
+            )
+            return
+
+        # a smart playlist's videos are chosen by its query
+        if isinstance(playlist, SmartPlaylist):
+            print(
+                "Cannot move video in {}: Playlist is a smart playlist".format(
+                    playlist_name
+                )
+            )
+            return
+
+        video = self._video_library.get_video(video_id)
+
+        # if the video doesn't exist, we say so
+        if not video:
+            print("Cannot move video in {}: Video does not exist".format(playlist_name))
+
+        # check if the video is in the playlist
+        elif not playlist.get_video(video_id):
+            print(
+                "Cannot move video in {}: Video is not in playlist".format(
+                    playlist_name
+                )
+            )
+
+        # the position must be one the playlist already has
+        elif not 1 <= position <= len(playlist):
+            print("Cannot move video in {}: Invalid position".format(playlist_name))
+
+        # otherwise we move the video
+        else:
+            playlist.move_video(video_id, position - 1)
+            self._record("move", playlist.get_name(), video_id, position - 1)
+            print(
+                "Moved video in {} to position {}: {}".format(
+                    playlist_name, position, video.title
+                )
+            )
 
     def show_all_playlists(self):
         """Display all playlists."""
@@ -276,13 +483,38 @@ class VideoPlayer:
         # else we print the playlists:
         print("Showing all playlists:")
 
-        # looping through the dictionary keys, which are the names of the playlists:
-        # and then printing them
-        # the lists are sorted in ascending order
-        playlist_names = list(self._playlists)
+        # printing the names the playlists were created with,
+        # sorted in ascending order
+        playlist_names = [playlist.get_name() for playlist in self._playlists.values()]
         for playlist_name in sorted(playlist_names):
             print(playlist_name)
 
+    def show_playlists_with(self, video_id):
+        """Display all playlists containing a video.
+
+        Args:
+            video_id: The video_id to look for.
+        """
+
+        # getting the video and its handle from the ID
+        video = self._video_library.get_video(video_id)
+        if not video:
+            print("Cannot show playlists: Video does not exist")
+            return
+
+        # the membership index knows the playlists directly
+        playlists = self._playlist_membership.playlists_with(
+            self._video_library.handle_of(video_id)
+        )
+
+        if not playlists:
+            print("No playlists contain {}".format(video.title))
+            return
+
+        print("Playlists containing {}:".format(video.title))
+        for playlist_name in sorted(playlist.get_name() for playlist in playlists):
+            print(playlist_name)
+
     def show_playlist(self, playlist_name):
         """Display all videos in a playlist with a given name.
 
@@ -290,44 +522,37 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
 
-        # normalising the playlist name to check for different cases:
-        norm_name = playlist_name.lower()
-
         # first check if play list doesn't exist
-        # for every playlist, check if the name already exits
-        for playlist_names in self._playlists.keys():
-            # if the name exists, we continue
-            if playlist_names.lower() == norm_name:
-                print("Showing playlist: {}".format(playlist_name))
-                videos = self._playlists[playlist_names].get_all_videos()
-
-                # if there are no videos yet
-                if videos == []:
-                    print("No videos here yet")
-                # else we print the videos
-                else:
-                    for video in videos:
-                        tags = " ".join([tag for tag in video.tags])
-
-                        # if the video is flagged, we need to display appropriate message
-                        if video.flagged:
-                            print(
-                                "{} ({}) [{}] - FLAGGED (reason: {})".format(
-                                    video.title,
-                                    video.video_id,
-                                    tags,
-                                    video.flagged_reason,
-                                )
-                            )
-                        else:
-                            print(
-                                "{} ({}) [{}]".format(video.title, video.video_id, tags)
-                            )
+        playlist = self._find_playlist(playlist_name)
+        if playlist is None:
+            print(
+                "Cannot show playlist {}: Playlist does not exist".format(playlist_name)
+            )
+            return
 
-                return
+        print("Showing playlist: {}".format(playlist_name))
+
+        # if there are no videos yet
+        if len(playlist) == 0:
+            print("No videos here yet")
+            return
 
-        # if we didn't find the playlist:
-        print("Cannot show playlist {}: Playlist does not exist".format(playlist_name))
+        # else we print the videos, looked up one at a time
+        for video in playlist.videos():
+            tags = " ".join([tag for tag in video.tags])
+
+            # if the video is flagged, we need to display appropriate message
+            if video.flagged:
+                print(
+                    "{} ({}) [{}] - FLAGGED (reason: {})".format(
+                        video.title,
+                        video.video_id,
+                        tags,
+                        video.flagged_reason,
+                    )
+                )
+            else:
+                print("{} ({}) [{}]".format(video.title, video.video_id, tags))
 
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
@@ -336,48 +561,49 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be removed.
         """
-        # normalising the playlist name to check for different cases:
-        norm_name = playlist_name.lower()
 
         # first check if play list doesn't exist
-        # for every playlist, check if the name already exits
-        for playlist_names in self._playlists.keys():
-            # if the name exists, we continue
-            if playlist_names.lower() == norm_name:
-                video = self._video_library.get_video(video_id)
-                playlist = self._playlists[playlist_names]
-                # if the video exists, we add to the list:
-                if video:
-                    # check if the video exists in the playlist
-                    if playlist.get_video(video_id):
-                        playlist.remove_video(video)
-                        print(
-                            "Removed video from {}: {}".format(
-                                playlist_name, video.title
-                            )
-                        )
-                    # else we print error to remove
-                    else:
-                        print(
-                            "Cannot remove video from {}: Video is not in playlist".format(
-                                playlist_name
-                            )
-                        )
-
-                # other wise we say it doesn't exist
-                else:
-                    print(
-                        "Cannot remove video from {}: Video does not exist".format(
-                            playlist_name
-                        )
-                    )
+        playlist = self._find_playlist(playlist_name)
+        if playlist is None:
+            print(
+                "Cannot remove video from {}: Playlist does not exist".format(
+                    playlist_name
+                )
+            )
+            return
 
-                return
+        # a smart playlist's videos are chosen by its query
+        if isinstance(playlist, SmartPlaylist):
+            print(
+                "Cannot remove video from {}: Playlist is a smart playlist".format(
+                    playlist_name
+                )
+            )
+            return
 
-        # if it is out of the loop, it didn't find any playlist:
-        print(
-            "Cannot remove video from {}: Playlist does not exist".format(playlist_name)
-        )
+        video = self._video_library.get_video(video_id)
+
+        # if the video doesn't exist, we say so
+        if not video:
+            print(
+                "Cannot remove video from {}: Video does not exist".format(
+                    playlist_name
+                )
+            )
+
+        # check if the video exists in the playlist
+        elif playlist.get_video(video_id):
+            playlist.remove_video(video)
+            self._record("remove", playlist.get_name(), video_id)
+            print("Removed video from {}: {}".format(playlist_name, video.title))
+
+        # else we print error to remove
+        else:
+            print(
+                "Cannot remove video from {}: Video is not in playlist".format(
+                    playlist_name
+                )
+            )
 
     def clear_playlist(self, playlist_name):
         """Removes all videos from a playlist with a given name.
@@ -385,22 +611,28 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        # normalising the playlist name to check for different cases:
-        norm_name = playlist_name.lower()
 
         # first check if play list doesn't exist
-        # for every playlist, check if the name already exits
-        for playlist_names in self._playlists.keys():
-            # if the name exists, we continue
-            if playlist_names.lower() == norm_name:
-                playlist = self._playlists[playlist_names]
-                # we clear the playlist
-                playlist.clear_video()
-                print("Successfully removed all videos from {}".format(playlist_name))
-                return
+        playlist = self._find_playlist(playlist_name)
+        if playlist is None:
+            print(
+                "Cannot clear playlist {}: Playlist does not exist".format(playlist_name)
+            )
+            return
 
-        # if it is out of the loop, it didn't find any playlist:
-        print("Cannot clear playlist {}: Playlist does not exist".format(playlist_name))
+        # a smart playlist's videos are chosen by its query
+        if isinstance(playlist, SmartPlaylist):
+            print(
+                "Cannot clear playlist {}: Playlist is a smart playlist".format(
+                    playlist_name
+                )
+            )
+            return
+
+        # we clear the playlist
+        playlist.clear_video()
+        self._record("clear", playlist.get_name())
+        print("Successfully removed all videos from {}".format(playlist_name))
 
     def delete_playlist(self, playlist_name):
         """Deletes a playlist with a given name.
@@ -409,104 +641,155 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
 
-        # normalising the playlist name to check for different cases:
-        norm_name = playlist_name.lower()
+        # we remove the playlist if it exists
+        playlist = self._playlists.pop(playlist_name.casefold(), None)
+        if playlist is None:
+            print(
+                "Cannot delete playlist {}: Playlist does not exist".format(
+                    playlist_name
+                )
+            )
+            return
 
-        # first check if play list doesn't exist
-        # for every playlist, check if the name already exits
-        for playlist_names in self._playlists.keys():
-            # if the name exists, we continue
-            if playlist_names.lower() == norm_name:
-                self._playlists.pop(playlist_names)
-                print("Deleted playlist: {}".format(playlist_name))
-                return
+        # emptying it first drops it from the membership index
+        if isinstance(playlist, SmartPlaylist):
+            playlist.close()
+        else:
+            playlist.clear_video()
+        self._record("delete", playlist.get_name())
+        print("Deleted playlist: {}".format(playlist_name))
 
-        print(
-            "Cannot delete playlist {}: Playlist does not exist".format(playlist_name)
-        )
+    def find_videos(
+        self, search_term, limit=None, offset=0, fuzzy=False, ranked=False
+    ):
+        """Returns the videos whose titles contain the search_term.
 
-    def search_videos(self, search_term):
-        """Display all the videos whose titles contain the search_term.
+        Unlike search_videos this neither prints nor asks anything.
 
         Args:
             search_term: The query to be used in search.
+            limit: The most results to return, None for all of them.
+            offset: The number of results to skip.
+            fuzzy: Whether to match the words of search_term against title
+                and tag words up to a few typos instead.
+            ranked: Whether to return the videos whose title and tag words
+                are most relevant to the words of search_term instead, the
+                10 best unless limit says otherwise.
+
+        Returns:
+            A list of the matching unflagged Video objects, sorted by title
+            (by number of typos first, for a fuzzy search, and by
+            relevance for a ranked one).
         """
 
-        # getting all videos
-        videos = self._video_library.get_all_videos()
+        # ranked searches score the candidates by BM25 and keep the best
+        if ranked:
+            return self._video_library.ranked_search(
+                search_term, 10 if limit is None else limit, offset
+            )
 
-        # creating a list of videos that contain search term
-        # and are not flagged
-        suggested_videos = [
-            video
-            for video in videos
-            if search_term.lower() in video.title.lower() and video.flagged == False
-        ]
+        # fuzzy searches go straight to the library's BK-tree; they are
+        # not cached since a change to any near-miss video affects them
+        if fuzzy:
+            return self._video_library.fuzzy_search(search_term, limit, offset)
 
-        # if no searches found:
-        if suggested_videos == []:
-            print("No search results for {}".format(search_term))
-            return
+        # the library answers the substring query from its title index
+        # and leaves out flagged videos; it stops once the page is full
+        return self._search_cache.search_titles(search_term, limit, offset)
 
-        # other wise the search results in something, which we must display
-        # count of videos displayed yet
-        count = 1
+    def find_videos_with_tag(self, video_tag, limit=None, offset=0):
+        """Returns the videos selected by a tag or boolean tag query.
 
-        print("Here are the results for {}:".format(search_term))
+        Unlike search_videos_tag this neither prints nor asks anything.
 
-        # sorting the videos
-        suggested_videos = sorted(suggested_videos)
+        Args:
+            video_tag: The video tag to be used in search, or a boolean
+                query combining tags and title:<text> terms with AND, OR
+                and NOT (see search_query).
+            limit: The most results to return, None for all of them.
+            offset: The number of results to skip.
 
-        # printing list of videos
-        for video in suggested_videos:
-            tags = " ".join([tag for tag in video.tags])
-            print("{}) {} ({}) [{}]".format(count, video.title, video.video_id, tags))
-            count += 1
+        Returns:
+            A list of the matching unflagged Video objects, sorted by title.
 
-        print(
-            "Would you like to play any of the above? If yes, specify the number of the video.\nIf your answer is not a valid number, we will assume it's a no."
-        )
+        Raises:
+            ValueError: If the query is malformed.
+        """
 
-        ip = input()
+        # the library plans the query over its tag and title indexes,
+        # which only yield unflagged videos
+        query = parse_search_query(video_tag.split())
+        return self._search_cache.query_videos(query, limit, offset)
+
+    def search_videos(
+        self,
+        search_term,
+        limit=None,
+        offset=0,
+        prompt=True,
+        fuzzy=False,
+        ranked=False,
+    ):
+        """Display all the videos whose titles contain the search_term.
 
-        if ip.isnumeric():
-            # if the input is a valid number
-            if int(ip) <= len(suggested_videos):
-                selected_video = suggested_videos[int(ip) - 1]
-                self.play_video(selected_video.video_id)
+        Args:
+            search_term: The query to be used in search.
+            limit: The most results to display, None for all of them.
+            offset: The number of results to skip; the displayed results
+                keep their numbers in the full list.
+            prompt: Whether to ask which result to play; either way the
+                results can be played later with play_result.
+            fuzzy: Whether to tolerate typos (see find_videos).
+            ranked: Whether to rank by relevance (see find_videos).
+        """
+        suggested_videos = self.find_videos(
+            search_term, limit, offset, fuzzy, ranked
+        )
+        self._show_results(search_term, suggested_videos, offset, prompt)
 
-    def search_videos_tag(self, video_tag):
+    def search_videos_tag(self, video_tag, limit=None, offset=0, prompt=True):
         """Display all videos whose tags contains the provided tag.
 
         Args:
-            video_tag: The video tag to be used in search.
+            video_tag: The video tag to be used in search, or a boolean
+                query combining tags and title:<text> terms with AND, OR
+                and NOT (see search_query).
+            limit: The most results to display, None for all of them.
+            offset: The number of results to skip; the displayed results
+                keep their numbers in the full list.
+            prompt: Whether to ask which result to play; either way the
+                results can be played later with play_result.
         """
+        try:
+            suggested_videos = self.find_videos_with_tag(video_tag, limit, offset)
+        except ValueError as error:
+            print("Cannot search videos: Invalid query ({})".format(error))
+            return
+        self._show_results(video_tag, suggested_videos, offset, prompt)
 
-        # getting all videos
-        videos = self._video_library.get_all_videos()
+    def _show_results(self, search_term, suggested_videos, offset, prompt):
+        """Displays search results and, if prompt, asks which one to play.
+
+        Args:
+            search_term: The query the results are for.
+            suggested_videos: The results, as returned by find_videos.
+            offset: The number of results skipped before them.
+            prompt: Whether to ask which result to play.
+        """
 
-        # creating a list of videos that contain search tag
-        # and are not flagged
-        suggested_videos = [
-            video
-            for video in videos
-            if video_tag.lower() in [tag.lower() for tag in video.tags]
-            and video.flagged == False
-        ]
+        # the results are kept for PLAY_RESULT, numbered as displayed
+        self._last_results = (offset, suggested_videos)
 
         # if no searches found:
         if suggested_videos == []:
-            print("No search results for {}".format(video_tag))
+            print("No search results for {}".format(search_term))
             return
 
         # other wise the search results in something, which we must display
-        # count of videos displayed yet
-        count = 1
-
-        print("Here are the results for {}:".format(video_tag))
+        # count of videos displayed yet, numbered from the start of the page
+        count = offset + 1
 
-        # sorting the videos
-        suggested_videos = sorted(suggested_videos)
+        print("Here are the results for {}:".format(search_term))
 
         # printing list of videos
         for video in suggested_videos:
@@ -514,6 +797,9 @@ class VideoPlayer:
             print("{}) {} ({}) [{}]".format(count, video.title, video.video_id, tags))
             count += 1
 
+        if not prompt:
+            return
+
         print(
             "Would you like to play any of the above? If yes, specify the number of the video.\nIf your answer is not a valid number, we will assume it's a no."
         )
@@ -522,10 +808,54 @@ class VideoPlayer:
 
         if ip.isnumeric():
             # if the input is a valid number
-            if int(ip) <= len(suggested_videos):
-                selected_video = suggested_videos[int(ip) - 1]
+            if offset < int(ip) <= offset + len(suggested_videos):
+                selected_video = suggested_videos[int(ip) - offset - 1]
                 self.play_video(selected_video.video_id)
 
+    def play_result(self, number):
+        """Plays a result of the last search.
+
+        Args:
+            number: The number the result was displayed with.
+        """
+        offset, suggested_videos = self._last_results
+        if not suggested_videos:
+            print("Cannot play result: No search results")
+        elif not offset < number <= offset + len(suggested_videos):
+            print("Cannot play result: Invalid result number")
+        else:
+            self.play_video(suggested_videos[number - offset - 1].video_id)
+
+    def suggest(self, prefix, limit=5):
+        """Display the title and tag words starting with a prefix.
+
+        Args:
+            prefix: The start of a word.
+            limit: The most words to display.
+        """
+
+        # the library keeps the best completions of every prefix, so this
+        # does not depend on how many words share the prefix
+        suggestions = self._video_library.suggest(prefix, limit)
+
+        if not suggestions:
+            print("No suggestions for {}".format(prefix))
+            return
+
+        print("Suggestions for {}:".format(prefix))
+        for word in suggestions:
+            print(word)
+
+    def show_search_cache_stats(self):
+        """Display how often searches were answered from the cache."""
+        print(
+            "Search cache: {} hits, {} misses, {} entries".format(
+                self._search_cache.hits,
+                self._search_cache.misses,
+                len(self._search_cache),
+            )
+        )
+
     def flag_video(self, video_id, flag_reason="Not supplied"):
         """Mark a video as flagged.
 
@@ -547,7 +877,7 @@ class VideoPlayer:
                 if self._current_video == video:
                     self.stop_video()
 
-                video.flag(flag_reason)
+                self._video_library.flag_video(video_id, flag_reason)
                 print(
                     "Successfully flagged video: {} (reason: {})".format(
                         video.title, flag_reason
@@ -570,7 +900,7 @@ class VideoPlayer:
         if video:
             # if the video is flagged, we unflag it
             if video.flagged:
-                video.allow()
+                self._video_library.allow_video(video_id)
                 print("Successfully removed flag from video: {}".format(video.title))
             # else we display an error
             else:
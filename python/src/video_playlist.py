@@ -1,37 +1,82 @@
 """A video playlist class."""
 
+from .order_statistic_tree import OrderStatisticTree
+
 
 class Playlist:
-    """A class used to represent a Playlist."""
+    """A class used to represent a Playlist.
+
+    A playlist only keeps the integer handles of its videos, in order; the
+    Video objects are looked up in the video library when the playlist is
+    read, so they always carry the current flag state.
+    """
 
-    def __init__(self, playlist_name):
-        """The VideoPlaylist class is initialized."""
-        self._videos = {}
+    def __init__(self, playlist_name, video_library, membership=None):
+        """The VideoPlaylist class is initialized.
+
+        Args:
+            playlist_name: The name the playlist is shown with.
+            video_library: The LibraryBackend resolving video handles.
+            membership: A PlaylistMembership to report added and removed
+                videos to, if any.
+        """
+        self._handles = OrderStatisticTree()
+        self._library = video_library
+        self._membership = membership
         self._name = playlist_name
-    
-    def get_all_videos(self):
-        """Returns all available video information from the video playlist."""
-        return list(self._videos.values())
-    
+
+    def __len__(self):
+        return len(self._handles)
+
+    def videos(self):
+        """Yields the videos of the playlist, in order."""
+        for handle in self._handles:
+            yield self._library.video_by_handle(handle)
+
     def get_name(self):
         """Returns playlist name"""
         return self._name
-    
+
     def add_video(self, video):
-        """Adds video to the playlist"""
-        self._videos[video.video_id] = video
+        """Adds video to the end of the playlist"""
+        handle = self._library.handle_of(video.video_id)
+        self._handles.append(handle)
+        if self._membership is not None:
+            self._membership.add(handle, self)
+
+    def insert_video(self, video, position):
+        """Inserts video into the playlist at a given position.
+
+        Args:
+            video: The Video to insert; it must not be in the playlist yet.
+            position: The 0-based position the video ends up at.
+        """
+        handle = self._library.handle_of(video.video_id)
+        self._handles.insert(position, handle)
+        if self._membership is not None:
+            self._membership.add(handle, self)
+
+    def move_video(self, video_id, position):
+        """Moves a video of the playlist to a given 0-based position."""
+        self._handles.move(self._library.handle_of(video_id), position)
+
+    def position_of(self, video_id):
+        """Returns the 0-based position of a video of the playlist."""
+        return self._handles.index(self._library.handle_of(video_id))
 
-        return list(self._videos.values())
-    
     def remove_video(self, video):
         """Removes video from the playlist"""
-        self._videos.pop(video.video_id)
+        handle = self._library.handle_of(video.video_id)
+        self._handles.remove(handle)
+        if self._membership is not None:
+            self._membership.discard(handle, self)
 
-        return list(self._videos.values())
-    
     def clear_video(self):
         """Clears all video in the playlist"""
-        self._videos = {}
+        if self._membership is not None:
+            for handle in self._handles:
+                self._membership.discard(handle, self)
+        self._handles.clear()
 
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the playlist
@@ -41,6 +86,9 @@ class Playlist:
 
         Returns:
             The Video object for the requested video_id. None if the video
-            does not exist.
+            is not in the playlist.
         """
-        return self._videos.get(video_id, None)
+        handle = self._library.handle_of(video_id)
+        if handle is None or handle not in self._handles:
+            return None
+        return self._library.video_by_handle(handle)
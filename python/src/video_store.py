@@ -0,0 +1,308 @@
+"""Storage engines holding the videos of a VideoLibrary."""
+
+from abc import abstractmethod
+from array import array
+from collections.abc import Mapping
+from typing import Sequence
+import io
+
+from .video import Video
+
+
+class VideoStore(Mapping):
+    """A mapping of video id -> Video whose entries are also numbered.
+
+    Every video has a row number in [0, len(store)), assigned in catalog
+    order. Indexes refer to videos by row so they can be built from
+    records() without materializing a Video per entry.
+    """
+
+    @abstractmethod
+    def row_of(self, video_id):
+        """Returns the row of video_id, or None if it is not stored."""
+
+    @abstractmethod
+    def video_at(self, row):
+        """Returns the Video stored at row."""
+
+    @abstractmethod
+    def records(self):
+        """Yields a (row, title, video_id, tags) tuple per stored video."""
+
+    def is_flagged(self, row):
+        """Returns whether the video at row is flagged."""
+        return self.video_at(row).flagged
+
+    def videos(self):
+        """Returns a list of every stored Video, in row order."""
+        return [self.video_at(row) for row in range(len(self))]
+
+    def __getitem__(self, video_id):
+        row = self.row_of(video_id)
+        if row is None:
+            raise KeyError(video_id)
+        return self.video_at(row)
+
+    def __iter__(self):
+        for _, _, video_id, _ in self.records():
+            yield video_id
+
+
+class EagerVideoStore(VideoStore):
+    """Keeps a fully built Video object for every row."""
+
+    def __init__(self, records, tag_dictionary):
+        """Builds the store.
+
+        Args:
+            records: An iterable of (title, video_id, tags) tuples.
+            tag_dictionary: The TagDictionary interning the tags, so that
+                videos share one string instance per distinct tag.
+        """
+        self._videos = []
+        self._rows = {}
+        for title, video_id, tags in records:
+            video = Video(
+                title, video_id, [tag_dictionary.canonical(tag) for tag in tags])
+            row = self._rows.get(video_id)
+            if row is None:
+                self._rows[video_id] = len(self._videos)
+                self._videos.append(video)
+            else:
+                # A repeated id replaces the earlier entry but keeps its row.
+                self._videos[row] = video
+
+    def __len__(self):
+        return len(self._videos)
+
+    def row_of(self, video_id):
+        return self._rows.get(video_id)
+
+    def video_at(self, row):
+        return self._videos[row]
+
+    def records(self):
+        for row, video in enumerate(self._videos):
+            yield row, video.title, video.video_id, video.tags
+
+    def videos(self):
+        return list(self._videos)
+
+
+class LazyVideoStore(VideoStore):
+    """Serves videos from a CompiledCatalog, building them on first use.
+
+    Materialized videos are cached so that their flag state persists.
+    """
+
+    def __init__(self, catalog, tag_dictionary):
+        """Wraps an open CompiledCatalog.
+
+        Args:
+            catalog: The CompiledCatalog to read.
+            tag_dictionary: The TagDictionary interning the tags of the
+                materialized videos.
+        """
+        self._catalog = catalog
+        self._tag_dictionary = tag_dictionary
+        self._materialized = {}
+
+    def __len__(self):
+        return len(self._catalog)
+
+    def row_of(self, video_id):
+        return self._catalog.find(video_id)
+
+    def video_at(self, row):
+        video = self._materialized.get(row)
+        if video is None:
+            title, video_id, tags = self._catalog.record(row)
+            video = Video(
+                title,
+                video_id,
+                [self._tag_dictionary.canonical(tag) for tag in tags],
+            )
+            self._materialized[row] = video
+        return video
+
+    def records(self):
+        for row in range(len(self._catalog)):
+            yield (row,) + self._catalog.record(row)
+
+    def is_flagged(self, row):
+        # Only a materialized video can have been flagged.
+        video = self._materialized.get(row)
+        return video is not None and video.flagged
+
+
+class VideoView(Video):
+    """A Video whose fields are read from a ColumnarVideoStore row."""
+
+    def __init__(self, store, row):
+        """Points the view at a row of the store."""
+        self._store = store
+        self._row = row
+
+    @property
+    def title(self) -> str:
+        return self._store.title_at(self._row)
+
+    @property
+    def video_id(self) -> str:
+        return self._store.video_id_at(self._row)
+
+    @property
+    def tags(self) -> Sequence[str]:
+        return self._store.tags_at(self._row)
+
+    @property
+    def flagged(self):
+        return self._store.is_flagged(self._row)
+
+    @property
+    def flagged_reason(self):
+        return self._store.flagged_reason_at(self._row)
+
+    def flag(self, reason=""):
+        self._store.set_flag(self._row, reason)
+
+    def allow(self):
+        self._store.clear_flag(self._row)
+
+
+class ColumnarVideoStore(VideoStore):
+    """Keeps videos in flat columns and hands out VideoView objects.
+
+    Titles and ids live in two string arenas addressed by offset arrays,
+    tags are TagDictionary tag ids, and flag state is a
+    bitmap plus a dict holding the reasons of the flagged rows only. Ids
+    are resolved by binary search over an id-sorted row array, so no
+    per-video Python object is kept.
+
+    Records are streamed into the arenas as they are read; only a dict of
+    video id -> row is kept while building, to collapse repeated ids.
+    """
+
+    def __init__(self, records, tag_dictionary):
+        """Builds the store.
+
+        Args:
+            records: An iterable of (title, video_id, tags) tuples.
+            tag_dictionary: The TagDictionary numbering the tags.
+        """
+        titles, ids = io.StringIO(), io.StringIO()
+        self._title_offsets = array("Q", [0])
+        self._id_offsets = array("Q", [0])
+        self._tag_dictionary = tag_dictionary
+        self._tag_refs = array("I")
+        self._tag_offsets = array("Q", [0])
+        # video id -> row, and row -> slot of the arenas holding it once an
+        # id has repeated (until then every row is its own slot)
+        rows = {}
+        slots = None
+        for slot, (title, video_id, tags) in enumerate(records):
+            titles.write(title)
+            ids.write(video_id)
+            self._title_offsets.append(self._title_offsets[-1] + len(title))
+            self._id_offsets.append(self._id_offsets[-1] + len(video_id))
+            for tag in tags:
+                self._tag_refs.append(tag_dictionary.intern(tag))
+            self._tag_offsets.append(len(self._tag_refs))
+            row = rows.get(video_id)
+            if row is None:
+                rows[video_id] = len(rows)
+                if slots is not None:
+                    slots.append(slot)
+            else:
+                # A repeated id replaces the earlier entry but keeps its
+                # row: the new record is appended and the row redirected.
+                if slots is None:
+                    slots = array("Q", range(slot))
+                slots[row] = slot
+        self._titles = titles.getvalue()
+        self._ids = ids.getvalue()
+        if slots is not None:
+            self._compact(slots)
+        self._id_order = array(
+            "Q", (rows[video_id] for video_id in sorted(rows)))
+        self._flags = bytearray((len(rows) + 7) // 8)
+        self._flag_reasons = {}
+
+    def _compact(self, slots):
+        """Rewrites the arenas to hold the slots listed, in that order, so
+        that the superseded records are dropped and row i is slot i."""
+        titles, ids = io.StringIO(), io.StringIO()
+        title_offsets = array("Q", [0])
+        id_offsets = array("Q", [0])
+        tag_refs = array("I")
+        tag_offsets = array("Q", [0])
+        for slot in slots:
+            title = self.title_at(slot)
+            video_id = self.video_id_at(slot)
+            titles.write(title)
+            ids.write(video_id)
+            title_offsets.append(title_offsets[-1] + len(title))
+            id_offsets.append(id_offsets[-1] + len(video_id))
+            tag_refs.extend(
+                self._tag_refs[self._tag_offsets[slot]:self._tag_offsets[slot + 1]])
+            tag_offsets.append(len(tag_refs))
+        self._titles = titles.getvalue()
+        self._ids = ids.getvalue()
+        self._title_offsets = title_offsets
+        self._id_offsets = id_offsets
+        self._tag_refs = tag_refs
+        self._tag_offsets = tag_offsets
+
+    def __len__(self):
+        return len(self._title_offsets) - 1
+
+    def title_at(self, row):
+        """Returns the title stored at row."""
+        return self._titles[self._title_offsets[row]:self._title_offsets[row + 1]]
+
+    def video_id_at(self, row):
+        """Returns the video id stored at row."""
+        return self._ids[self._id_offsets[row]:self._id_offsets[row + 1]]
+
+    def tags_at(self, row):
+        """Returns the tags stored at row, as a tuple."""
+        refs = self._tag_refs[self._tag_offsets[row]:self._tag_offsets[row + 1]]
+        return tuple(self._tag_dictionary.name(ref) for ref in refs)
+
+    def flagged_reason_at(self, row):
+        """Returns the flag reason of row, "" if it is not flagged."""
+        return self._flag_reasons.get(row, "")
+
+    def set_flag(self, row, reason):
+        """Sets the flag bit of row and records the reason."""
+        self._flags[row >> 3] |= 1 << (row & 7)
+        self._flag_reasons[row] = reason
+
+    def clear_flag(self, row):
+        """Clears the flag bit of row."""
+        self._flags[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+        self._flag_reasons.pop(row, None)
+
+    def is_flagged(self, row):
+        return bool(self._flags[row >> 3] & (1 << (row & 7)))
+
+    def row_of(self, video_id):
+        low, high = 0, len(self._id_order)
+        while low < high:
+            middle = (low + high) // 2
+            row = self._id_order[middle]
+            current = self.video_id_at(row)
+            if current < video_id:
+                low = middle + 1
+            elif current > video_id:
+                high = middle
+            else:
+                return row
+        return None
+
+    def video_at(self, row):
+        return VideoView(self, row)
+
+    def records(self):
+        for row in range(len(self)):
+            yield row, self.title_at(row), self.video_id_at(row), self.tags_at(row)
@@ -0,0 +1,42 @@
+import pytest
+
+from src.bm25_index import Bm25Index
+from src.sqlite_library import SqliteVideoLibrary
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_rarer_and_repeated_words_score_higher():
+    index = Bm25Index([
+        (10, "Cat cat cat", []),
+        (11, "Cat and dog", ["#dog"]),
+        (12, "Dog", []),
+        (13, "Bird", ["#bird"]),
+    ])
+    assert [handle for _, handle in index.search("cat", 5)] == [10, 11]
+    assert [handle for _, handle in index.search("dog cat", 1)] == [11]
+    assert [handle for _, handle in index.search("cat dog", 5,
+                                                 lambda handle: handle != 11)] == [
+        10, 12]
+    assert index.search("fish", 5) == []
+
+
+@pytest.mark.parametrize("backend", [VideoLibrary, SqliteVideoLibrary])
+def test_ranked_search(backend):
+    library = backend()
+    found = library.ranked_search("cat video")
+    assert [video.video_id for video in found] == [
+        "another_cat_video_id", "nothing_video_id", "amazing_cats_video_id"]
+    library.flag_video("another_cat_video_id")
+    found = library.ranked_search("cat video", limit=1, offset=1)
+    assert [video.video_id for video in found] == ["amazing_cats_video_id"]
+
+
+def test_search_videos_ranked_option(capfd):
+    player = VideoPlayer()
+    player.search_videos("cats", limit=1, prompt=False, ranked=True)
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Here are the results for cats:",
+        "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+    ]
@@ -0,0 +1,69 @@
+import os
+import pickle
+
+from src.catalog_snapshot import load_snapshot, snapshot_path
+from src.video_library import DEFAULT_CATALOG, VideoLibrary
+
+
+def _catalog(tmp_path):
+    source = tmp_path / "videos.txt"
+    source.write_text(DEFAULT_CATALOG.read_text())
+    return source
+
+
+def test_snapshot_is_written_and_reused(tmp_path):
+    source = _catalog(tmp_path)
+    VideoLibrary(source)
+    assert snapshot_path(source).exists()
+
+    # Swap the contents for same-sized garbage but keep the mtime: the
+    # snapshot still matches, so the file is not parsed again.
+    stat = os.stat(source)
+    source.write_bytes(b"x" * stat.st_size)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    library = VideoLibrary(source)
+    assert len(library.get_all_videos()) == 5
+    assert [video.video_id for video in library.get_videos_with_tag("#dog")] \
+        == ["funny_dogs_video_id"]
+
+
+def test_stale_snapshot_is_rebuilt(tmp_path):
+    source = _catalog(tmp_path)
+    VideoLibrary(source)
+    with open(source, "a") as video_file:
+        video_file.write("\nNew Video | new_video_id | #new")
+
+    library = VideoLibrary(source)
+    assert library.get_video("new_video_id").tags == ("#new",)
+    assert len(VideoLibrary(source).get_all_videos()) == 6
+
+
+def test_corrupt_snapshot_falls_back_to_parsing(tmp_path):
+    source = _catalog(tmp_path)
+    VideoLibrary(source)
+    snapshot_path(source).write_bytes(b"not a snapshot")
+
+    library = VideoLibrary(source)
+    assert len(library.get_all_videos()) == 5
+
+
+def test_snapshot_is_per_storage_engine(tmp_path):
+    source = _catalog(tmp_path)
+    VideoLibrary(source)
+
+    library = VideoLibrary(source, storage="columnar")
+    library.flag_video("amazing_cats_video_id")
+    assert library.get_video("amazing_cats_video_id").flagged
+
+
+def test_stale_snapshot_state_is_not_unpickled(tmp_path, monkeypatch):
+    source = _catalog(tmp_path)
+    VideoLibrary(source)
+    with open(source, "a") as video_file:
+        video_file.write("\nNew Video | new_video_id | #new")
+
+    loads = []
+    monkeypatch.setattr(pickle, "load", lambda *args: loads.append(args))
+    assert load_snapshot(source, "objects") is None
+    assert loads == []
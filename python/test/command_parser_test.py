@@ -0,0 +1,59 @@
+import pytest
+
+from src.command_parser import Command, CommandException, CommandParser
+from src.video_player import VideoPlayer
+
+
+def test_commands_are_case_insensitive(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["number_of_videos"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == ["5 videos in the library"]
+
+
+@pytest.mark.parametrize("command, message", [
+    ([], "Please enter a valid command, type HELP for a list of available "
+         "commands."),
+    (["NOT_A_COMMAND"], "Please enter a valid command, type HELP for a list "
+                        "of available commands."),
+    (["PLAY"], "Please enter PLAY command followed by video_id."),
+    (["ADD_TO_PLAYLIST", "a"], "Please enter ADD_TO_PLAYLIST command followed "
+                               "by a playlist name and video_id to add."),
+    (["MOVE_IN_PLAYLIST", "a", "b", "first"], "Please enter MOVE_IN_PLAYLIST "
+     "command followed by a playlist name, video_id to move and position "
+     "number."),
+    (["FLAG_VIDEO", "a", "b", "c"], "Please enter FLAG_VIDEO command followed "
+                                    "by a video_id and an optional flag "
+                                    "reason."),
+    (["PLAY_RESULT", "\u00b2"], "Please enter PLAY_RESULT command followed by "
+                               "a result number."),
+    (["SEARCH_VIDEOS", "cat", "LIMIT", "\u00b2"], "Please enter LIMIT and OFFSET "
+     "at most once each, followed by a number."),
+    (["SEARCH_VIDEOS", "cat", "--fuzzy", "--RANKED"], "Please enter at most one "
+                                                   "of --fuzzy and --ranked."),
+    (["SEARCH_VIDEOS", "two", "words"], "Please enter SEARCH_VIDEOS command "
+                                        "followed by a search term."),
+])
+def test_argument_errors(command, message):
+    parser = CommandParser(VideoPlayer())
+    with pytest.raises(CommandException) as error:
+        parser.execute_command(command)
+    assert str(error.value) == message
+
+
+def test_registered_commands_run_and_show_in_help(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.register(Command(
+        "ECHO", lambda args: print(args), "Prints a number.", "<number>", 1, 1,
+        numeric=(0,), error="Please enter ECHO command followed by a number."))
+    parser.execute_command(["echo", "42"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["ECHO", "x"])
+    parser.execute_command(["HELP"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[0] == "[42]"
+    assert lines[2] == "Available commands:"
+    assert "    PLAY <video_id> - Plays specified video." in lines
+    assert "    ECHO <number> - Prints a number." in lines
+    assert lines[-2] == "    EXIT - Terminates the program execution."
@@ -0,0 +1,72 @@
+import pytest
+
+from src.bk_tree import BKTree, edit_distance
+from src.fuzzy_index import FuzzyIndex
+from src.sqlite_library import SqliteVideoLibrary
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+    assert edit_distance("same", "same") == 0
+    # a swap of adjacent letters is one edit, and can be edited again
+    assert edit_distance("cta", "cat") == 1
+    assert edit_distance("aobut", "about") == 1
+    assert edit_distance("ca", "abc") == 2
+
+
+def test_bk_tree_matches_brute_force():
+    words = ["cat", "cats", "cut", "dog", "dogs", "google", "goggle", "nothing"]
+    tree = BKTree(words + ["cat"])
+    assert len(tree) == len(words)
+    for query in ["cat", "dgo", "ogd", "gogle", "googel", "xyz", "nthing"]:
+        for max_distance in range(3):
+            expected = sorted(
+                (edit_distance(query, word), word) for word in words
+                if edit_distance(query, word) <= max_distance)
+            assert sorted(tree.search(query, max_distance)) == expected
+
+
+def test_every_query_word_must_match():
+    index = FuzzyIndex([
+        (0, "Funny Dogs", ["#dog"]),
+        (1, "Amazing Cats", ["#cat"]),
+    ])
+    assert index.search("funy dogz") == {0: 2}
+    assert index.search("amazng dogs") == {}
+    assert index.search("#CAT") == {1: 0}
+
+
+@pytest.mark.parametrize("backend", [VideoLibrary, SqliteVideoLibrary])
+def test_fuzzy_search_ranks_by_typos(backend):
+    library = backend()
+    library.flag_video("life_at_google_video_id")
+    found = library.fuzzy_search("cat")
+    assert [video.video_id for video in found] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert library.fuzzy_search("googel") == []
+    assert [video.video_id for video in library.fuzzy_search("vdeo", 1, 0)] == [
+        "another_cat_video_id"]
+
+
+@pytest.mark.parametrize("backend", [VideoLibrary, SqliteVideoLibrary])
+def test_fuzzy_search_forgives_swapped_letters(backend):
+    library = backend()
+    assert [video.video_id for video in library.fuzzy_search("cta")] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert [video.video_id for video in library.fuzzy_search("dgos")] == [
+        "funny_dogs_video_id"]
+    assert [video.video_id for video in library.fuzzy_search("aobut")] == [
+        "nothing_video_id"]
+
+
+def test_search_videos_fuzzy_option(capfd):
+    player = VideoPlayer()
+    player.search_videos("Amazng", prompt=False, fuzzy=True)
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Here are the results for Amazng:",
+        "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+    ]
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from src.order_statistic_tree import OrderStatisticTree
+
+
+def test_positional_edits_match_a_list():
+    tree = OrderStatisticTree()
+    expected = []
+    rng = random.Random(1)
+    for key in range(300):
+        position = rng.randrange(len(expected) + 1)
+        tree.insert(position, key)
+        expected.insert(position, key)
+    for key in rng.sample(range(300), 100):
+        tree.remove(key)
+        expected.remove(key)
+    for key in rng.sample(expected, 50):
+        position = rng.randrange(len(expected))
+        tree.move(key, position)
+        expected.remove(key)
+        expected.insert(position, key)
+
+    assert list(tree) == expected
+    assert len(tree) == len(expected)
+    assert all(tree.index(key) == position
+               for position, key in enumerate(expected))
+
+
+def test_membership_and_errors():
+    tree = OrderStatisticTree([4, 2])
+    assert 4 in tree and 3 not in tree
+    with pytest.raises(ValueError):
+        tree.append(4)
+    with pytest.raises(KeyError):
+        tree.remove(3)
+    tree.clear()
+    assert list(tree) == []
+
+
+def test_freed_slots_are_reused():
+    tree = OrderStatisticTree(range(10))
+    for key in range(5):
+        tree.remove(key)
+    for key in range(10, 15):
+        tree.insert(0, key)
+
+    assert list(tree) == [14, 13, 12, 11, 10, 5, 6, 7, 8, 9]
@@ -235,3 +235,67 @@ def test_delete_playlist_nonexistent(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "Cannot delete playlist my_cool_playlist: Playlist does not exist" in lines[0]
+
+
+def test_playlist_commands_resolve_names_in_any_case(capfd):
+    player = VideoPlayer()
+    player.create_playlist("Road_Trip")
+    player.add_to_playlist("ROAD_trip", "amazing_cats_video_id")
+    player.delete_playlist("road_TRIP")
+    player.show_playlist("Road_Trip")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 4
+    assert "Added video to ROAD_trip: Amazing Cats" in lines[1]
+    assert "Deleted playlist: road_TRIP" in lines[2]
+    assert "Cannot show playlist Road_Trip: Playlist does not exist" in lines[3]
+
+
+def test_insert_and_move_in_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.insert_into_playlist("my_playlist", "life_at_google_video_id", 1)
+    player.insert_into_playlist("my_playlist", "nothing_video_id", 6)
+    player.move_in_playlist("my_playlist", "funny_dogs_video_id", 2)
+    player.move_in_playlist("my_playlist", "another_cat_video_id", 1)
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 11
+    assert "Added video to my_playlist at position 1: Life at Google" in lines[3]
+    assert "Cannot add video to my_playlist: Invalid position" in lines[4]
+    assert "Moved video in my_playlist to position 2: Funny Dogs" in lines[5]
+    assert ("Cannot move video in my_playlist: Video is not in playlist"
+            in lines[6])
+    assert "Life at Google (life_at_google_video_id)" in lines[8]
+    assert "Funny Dogs (funny_dogs_video_id)" in lines[9]
+    assert "Amazing Cats (amazing_cats_video_id)" in lines[10]
+
+
+def test_show_playlists_with_video(capfd):
+    player = VideoPlayer()
+    player.create_playlist("b_playlist")
+    player.create_playlist("a_playlist")
+    player.create_playlist("c_playlist")
+    player.add_to_playlist("b_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("a_playlist", "amazing_cats_video_id")
+    player.insert_into_playlist("c_playlist", "amazing_cats_video_id", 1)
+    player.remove_from_playlist("b_playlist", "amazing_cats_video_id")
+    player.delete_playlist("c_playlist")
+    capfd.readouterr()
+
+    player.show_playlists_with("amazing_cats_video_id")
+    player.clear_playlist("a_playlist")
+    player.show_playlists_with("amazing_cats_video_id")
+    player.show_playlists_with("does_not_exist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Playlists containing Amazing Cats:",
+        "a_playlist",
+        "Successfully removed all videos from a_playlist",
+        "No playlists contain Amazing Cats",
+        "Cannot show playlists: Video does not exist",
+    ]
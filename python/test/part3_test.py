@@ -1,3 +1,4 @@
+from src.command_parser import CommandParser
 from src.video_player import VideoPlayer
 from unittest import mock
 
@@ -160,3 +161,48 @@ def test_search_videos_tag_no_results(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "No search results for #blah" in lines[0]
+
+
+@mock.patch("src.video_player.input", lambda *args: "3")
+def test_search_videos_page_keeps_result_numbers(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    parser.execute_command(["SEARCH_VIDEOS", "o", "LIMIT", "2", "OFFSET", "2"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[:3] == [
+        "Here are the results for o:",
+        "3) Life at Google (life_at_google_video_id) [#google #career]",
+        "4) Video about nothing (nothing_video_id) []",
+    ]
+    assert lines[5] == "Playing video: Life at Google"
+
+
+def test_search_without_prompt_then_play_result(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    parser.execute_command(["PLAY_RESULT", "1"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#cat", "--no-prompt"])
+    parser.execute_command(["PLAY_RESULT", "3"])
+    parser.execute_command(["PLAY_RESULT", "2"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Cannot play result: No search results",
+        "Here are the results for #cat:",
+        "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "2) Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "Cannot play result: Invalid result number",
+        "Playing video: Another Cat Video",
+    ]
+
+
+def test_find_videos_does_not_print(capfd):
+    player = VideoPlayer()
+    videos = player.find_videos("cat", limit=1)
+    tagged = player.find_videos_with_tag("#dog OR #google")
+    out, err = capfd.readouterr()
+    assert out == ""
+    assert [video.video_id for video in videos] == ["amazing_cats_video_id"]
+    assert [video.video_id for video in tagged] == [
+        "funny_dogs_video_id", "life_at_google_video_id"]
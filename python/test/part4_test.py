@@ -269,3 +269,15 @@ def test_allow_video_show_playlist(capfd):
     assert "Successfully removed flag from video: Amazing Cats" in lines[5]
     assert "Showing playlist: my_playlist" in lines[6]
     assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[7]
+
+
+def test_play_random_is_reproducible_with_a_seed(capfd):
+    outputs = []
+    for _ in range(2):
+        player = VideoPlayer(seed=7)
+        for _ in range(5):
+            player.play_random_video()
+        out, err = capfd.readouterr()
+        outputs.append(out)
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0].splitlines()) == 9
@@ -0,0 +1,97 @@
+from src.playlist_store import JOURNAL_NAME, SNAPSHOT_NAME, PlaylistStore
+from src.video_player import VideoPlayer
+
+
+def test_playlists_survive_a_restart(tmp_path, capfd):
+    player = VideoPlayer(playlist_store=PlaylistStore(tmp_path))
+    player.create_playlist("my_PLAYlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.remove_from_playlist("MY_playlist", "amazing_cats_video_id")
+    player.create_playlist("doomed")
+    player.delete_playlist("DOOMED")
+    player.close()
+    capfd.readouterr()
+
+    player = VideoPlayer(playlist_store=PlaylistStore(tmp_path))
+    player.show_all_playlists()
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Showing all playlists:",
+        "my_PLAYlist",
+        "Showing playlist: my_playlist",
+        "Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+    ]
+
+
+def test_entries_are_written_in_batches(tmp_path):
+    store = PlaylistStore(tmp_path, batch_size=3)
+    store.record("create", "a")
+    store.record("add", "a", "funny_dogs_video_id")
+    assert (tmp_path / JOURNAL_NAME).read_text() == ""
+
+    store.record("add", "a", "amazing_cats_video_id")
+    assert len((tmp_path / JOURNAL_NAME).read_text().splitlines()) == 3
+    store.close()
+
+
+def test_journal_is_compacted_into_a_snapshot(tmp_path):
+    store = PlaylistStore(tmp_path, batch_size=1, compact_after=4)
+    store.record("create", "a")
+    store.record("add", "a", "funny_dogs_video_id")
+    store.record("add", "a", "amazing_cats_video_id")
+    store.record("remove", "a", "funny_dogs_video_id")
+    assert (tmp_path / SNAPSHOT_NAME).exists()
+    assert (tmp_path / JOURNAL_NAME).read_text() == ""
+    store.record("create", "b")
+    store.close()
+
+    assert PlaylistStore(tmp_path).playlists() == [
+        ("a", ["amazing_cats_video_id"]), ("b", [])]
+
+
+def test_torn_journal_tail_is_dropped(tmp_path):
+    store = PlaylistStore(tmp_path)
+    store.record("create", "a")
+    store.close()
+    with open(tmp_path / JOURNAL_NAME, "a") as journal:
+        journal.write('[2, "add", "a", "funny_')
+
+    store = PlaylistStore(tmp_path)
+    assert store.playlists() == [("a", [])]
+    store.record("add", "a", "amazing_cats_video_id")
+    store.close()
+    assert PlaylistStore(tmp_path).playlists() == [
+        ("a", ["amazing_cats_video_id"])]
+
+
+def test_positional_changes_survive_a_restart(tmp_path, capfd):
+    player = VideoPlayer(playlist_store=PlaylistStore(tmp_path))
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.insert_into_playlist("my_playlist", "nothing_video_id", 2)
+    player.move_in_playlist("my_playlist", "amazing_cats_video_id", 3)
+    player.close()
+
+    assert PlaylistStore(tmp_path).playlists() == [(
+        "my_playlist",
+        ["nothing_video_id", "funny_dogs_video_id", "amazing_cats_video_id"],
+    )]
+
+
+def test_snapshot_keeps_playlist_order(tmp_path):
+    store = PlaylistStore(tmp_path, batch_size=1, compact_after=6)
+    store.record("create", "a")
+    for video_id in ("v1", "v2", "v3"):
+        store.record("add", "a", video_id)
+    store.record("move", "a", "v3", 0)
+    store.record("insert", "a", "v0", 1)
+    assert (tmp_path / SNAPSHOT_NAME).exists()
+    store.record("add", "a", "v2")
+    store.close()
+
+    assert PlaylistStore(tmp_path).playlists() == [
+        ("a", ["v3", "v0", "v1", "v2"])]
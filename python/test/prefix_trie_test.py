@@ -0,0 +1,46 @@
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.prefix_trie import MAX_COMPLETIONS, PrefixTrie
+from src.sqlite_library import SqliteVideoLibrary
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_completions_match_brute_force():
+    weights = {"cat": 3, "cats": 1, "car": 2, "cart": 2, "c": 1, "dog": 5,
+               "do": 1, "door": 2, "doormat": 1}
+    trie = PrefixTrie(weights)
+    for prefix in ["", "c", "ca", "car", "cat", "cats", "catsx", "do", "doo",
+                   "doorm", "x"]:
+        expected = sorted(
+            (word for word in weights if word.startswith(prefix)),
+            key=lambda word: (-weights[word], word))
+        assert trie.complete(prefix) == expected[:MAX_COMPLETIONS]
+        assert trie.complete(prefix, 2) == expected[:2]
+
+
+@pytest.mark.parametrize("backend", [VideoLibrary, SqliteVideoLibrary])
+def test_suggest_title_and_tag_words(backend):
+    library = backend()
+    assert library.suggest("A", 3) == ["about", "amazing", "another"]
+    assert library.suggest("#CA", 5) == ["#cat", "#career"]
+    assert library.suggest("ca", 5) == ["cat", "cats"]
+    assert library.suggest("#", 2) == ["#animal", "#cat"]
+
+
+def test_suggest_command(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SUGGEST", "go", "1"])
+    parser.execute_command(["SUGGEST", "zzz"])
+    parser.execute_command(["SUGGEST", "#D"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["SUGGEST", "a", str(MAX_COMPLETIONS + 1)])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Suggestions for go:",
+        "google",
+        "No suggestions for zzz",
+        "Suggestions for #D:",
+        "#dog",
+    ]
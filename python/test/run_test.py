@@ -0,0 +1,81 @@
+import io
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.command_parser import CommandParser
+from src.playlist_store import JOURNAL_NAME, PlaylistStore
+from src.run import run_batch, run_interactive
+from src.video_player import VideoPlayer
+
+
+def test_batch_runs_every_command_and_reports_failures():
+    parser = CommandParser(VideoPlayer(), prompt=False)
+    output = io.StringIO()
+    report = io.StringIO()
+    script = [
+        "# a comment\n",
+        "PLAY amazing_cats_video_id\n",
+        "\n",
+        "PLAY\n",
+        "NOT_A_COMMAND\n",
+        "SEARCH_VIDEOS cat\n",
+        "EXIT\n",
+        "STOP\n",
+    ]
+    failures = run_batch(parser, script, output, report)
+    assert failures == [
+        (4, "PLAY", "Please enter PLAY command followed by video_id."),
+        (5, "NOT_A_COMMAND", "Please enter a valid command, type HELP for a "
+                             "list of available commands."),
+    ]
+    assert output.getvalue().splitlines() == [
+        "Playing video: Amazing Cats",
+        "Please enter PLAY command followed by video_id.",
+        "Please enter a valid command, type HELP for a list of available "
+        "commands.",
+        "Here are the results for cat:",
+        "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "2) Another Cat Video (another_cat_video_id) [#cat #animal]",
+    ]
+    lines = report.getvalue().splitlines()
+    assert lines[0] == "line 4: PLAY: Please enter PLAY command followed by video_id."
+    assert lines[1].startswith("line 5: NOT_A_COMMAND: ")
+    assert lines[2].startswith("4 commands in ")
+    assert lines[2].endswith(", 2 failed")
+
+
+def test_batch_mode_reads_piped_stdin(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-m", "src.run"],
+        input="NUMBER_OF_VIDEOS\nSEARCH_VIDEOS_WITH_TAG #dog\n",
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+        env=dict(os.environ, YT_PLAYLISTS_DIR=str(tmp_path)),
+    )
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == [
+        "5 videos in the library",
+        "Here are the results for #dog:",
+        "1) Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+    ]
+    assert result.stderr.endswith(", 0 failed\n")
+
+
+def test_interactive_mode_saves_each_change_before_prompting(
+        tmp_path, monkeypatch, capfd):
+    store = PlaylistStore(tmp_path)
+    parser = CommandParser(VideoPlayer(playlist_store=store))
+    journals = []
+
+    def answer(prompt):
+        journals.append((tmp_path / JOURNAL_NAME).read_text())
+        return ["CREATE_PLAYLIST mine", "EXIT"][len(journals) - 1]
+
+    monkeypatch.setattr("builtins.input", answer)
+    run_interactive(parser, store)
+    assert journals[0] == ""
+    assert '"create", "mine"' in journals[1]
+    store.close()
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from src.search_cache import SearchCache
+from src.search_query import parse_search_query
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _ids(videos):
+    return [video.video_id for video in videos]
+
+
+def test_repeated_searches_hit_the_cache():
+    cache = SearchCache(VideoLibrary())
+    assert _ids(cache.search_titles("CAT")) == _ids(cache.search_titles("cat"))
+    cache.query_videos(parse_search_query(["#cat", "OR", "#dog"]))
+    cache.query_videos(parse_search_query(["#DOG", "OR", "#cat"]))
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+
+
+def test_only_entries_selecting_a_changed_video_are_dropped():
+    library = VideoLibrary()
+    cache = SearchCache(library)
+    cats = parse_search_query(["#cat"])
+    dogs = parse_search_query(["#dog"])
+    cache.query_videos(cats)
+    cache.query_videos(dogs)
+
+    library.flag_video("funny_dogs_video_id")
+    assert _ids(cache.query_videos(dogs)) == []
+    assert _ids(cache.query_videos(cats)) == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    library.allow_video("funny_dogs_video_id")
+    assert _ids(cache.query_videos(dogs)) == ["funny_dogs_video_id"]
+
+
+def test_cache_is_bounded():
+    library = VideoLibrary()
+    cache = SearchCache(library, max_entries=2, max_results=3)
+    cache.search_titles("a")
+    cache.search_titles("cat")
+    cache.search_titles("dog")
+    cache.search_titles("google")
+    assert len(cache) == 2
+    cache.search_titles("dog")
+    cache.search_titles("cat")
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+@mock.patch("src.video_player.input", lambda *args: "No")
+def test_search_cache_stats(capfd):
+    player = VideoPlayer()
+    player.search_videos("cat")
+    player.search_videos("Cat")
+    capfd.readouterr()
+    player.show_search_cache_stats()
+    out, err = capfd.readouterr()
+    assert out == "Search cache: 1 hits, 1 misses, 1 entries\n"
@@ -0,0 +1,86 @@
+from unittest import mock
+
+import pytest
+
+from src.search_query import parse_search_query
+from src.sqlite_library import SqliteVideoLibrary
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+QUERIES = [
+    "#cat",
+    "#CAT AND #animal",
+    "#cat OR #dog",
+    "#animal NOT #dog",
+    "NOT #animal",
+    "NOT (#cat OR #dog)",
+    "(#dog OR title:amazing) #animal",
+    "title:a AND NOT title:cat",
+    "#google OR NOT title:e",
+    "#nothing OR #cat AND #missing",
+]
+
+
+def _expected(library, text):
+    """Answers a query by checking every video, the slow way."""
+
+    def matches(query, video):
+        kind = type(query).__name__
+        if kind == "TagTerm":
+            return query.tag.casefold() in {tag.casefold() for tag in video.tags}
+        if kind == "TitleTerm":
+            return query.text.casefold() in video.title.casefold()
+        if kind == "AndQuery":
+            return all(matches(part, video) for part in query.parts)
+        if kind == "OrQuery":
+            return any(matches(part, video) for part in query.parts)
+        return not matches(query.part, video)
+
+    query = parse_search_query(text.split())
+    return [video.video_id for video in library.get_all_videos()
+            if not video.flagged and matches(query, video)]
+
+
+@pytest.mark.parametrize("backend", [VideoLibrary, SqliteVideoLibrary])
+@pytest.mark.parametrize("text", QUERIES)
+def test_query_matches_a_full_scan(backend, text):
+    library = backend()
+    library.flag_video("another_cat_video_id")
+    found = library.query_videos(parse_search_query(text.split()))
+    assert [video.video_id for video in found] == _expected(library, text)
+
+
+@pytest.mark.parametrize("text", ["", "#cat AND", "(#cat", "#cat)", "OR #cat"])
+def test_malformed_queries_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_search_query(text.split())
+
+
+@mock.patch("src.video_player.input", lambda *args: "No")
+def test_search_videos_with_tag_query(capfd):
+    player = VideoPlayer()
+    player.search_videos_tag("#animal AND NOT title:amazing")
+    player.search_videos_tag("#cat AND")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[:3] == [
+        "Here are the results for #animal AND NOT title:amazing:",
+        "1) Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "2) Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+    ]
+    assert lines[5] == "Cannot search videos: Invalid query (Unexpected end of query)"
+
+
+@pytest.mark.parametrize("backend", [VideoLibrary, SqliteVideoLibrary])
+def test_searches_return_pages(backend):
+    library = backend()
+    everything = [video.video_id for video in library.search_titles("o")]
+    for limit, offset in [(2, 0), (2, 2), (10, 3), (0, 0), (None, 4)]:
+        page = library.search_titles("o", limit, offset)
+        stop = None if limit is None else offset + limit
+        assert [video.video_id for video in page] == everything[offset:stop]
+
+    query = parse_search_query(["#animal"])
+    page = library.query_videos(query, limit=1, offset=1)
+    assert [video.video_id for video in page] == ["another_cat_video_id"]
@@ -0,0 +1,91 @@
+from src.playlist_store import PlaylistStore
+from src.smart_playlist import VideoQuery
+from src.video_player import VideoPlayer
+
+import pytest
+
+
+def test_query_terms_round_trip():
+    query = VideoQuery.parse(["TAG:#cat", "title:Amazing", "status:ANY"])
+    assert str(query) == "tag:#cat title:Amazing status:any"
+    assert str(VideoQuery.parse(str(query).split())) == str(query)
+    with pytest.raises(ValueError):
+        VideoQuery.parse(["status:maybe"])
+    with pytest.raises(ValueError):
+        VideoQuery.parse(["colour:red"])
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_smart_playlist_follows_flags(backend, capfd):
+    player = VideoPlayer(backend=backend)
+    player.create_smart_playlist("animals", ["tag:#ANIMAL"])
+    player.create_smart_playlist("banned", ["status:flagged"])
+    player.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    player.show_playlist("animals")
+    player.show_playlist("banned")
+    player.allow_video("funny_dogs_video_id")
+    player.show_playlist("animals")
+    player.show_playlist("banned")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Successfully created new smart playlist: animals (3 videos)",
+        "Successfully created new smart playlist: banned (0 videos)",
+        "Successfully flagged video: Funny Dogs (reason: dont_like_dogs)",
+        "Showing playlist: animals",
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "Showing playlist: banned",
+        "Funny Dogs (funny_dogs_video_id) [#dog #animal] - FLAGGED (reason: dont_like_dogs)",
+        "Successfully removed flag from video: Funny Dogs",
+        "Showing playlist: animals",
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "Showing playlist: banned",
+        "No videos here yet",
+    ]
+
+
+def test_smart_playlist_cannot_be_edited(capfd):
+    player = VideoPlayer()
+    player.create_smart_playlist("cats", ["title:cat"])
+    player.create_smart_playlist("CATS", ["title:dog"])
+    player.create_smart_playlist("odd", ["colour:red"])
+    player.add_to_playlist("cats", "funny_dogs_video_id")
+    player.clear_playlist("cats")
+    player.show_playlists_with("amazing_cats_video_id")
+    player.delete_playlist("cats")
+    player.show_playlists_with("amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Successfully created new smart playlist: cats (2 videos)",
+        "Cannot create playlist: A playlist with the same name already exists",
+        "Cannot create playlist: Invalid query term colour:red",
+        "Cannot add video to cats: Playlist is a smart playlist",
+        "Cannot clear playlist cats: Playlist is a smart playlist",
+        "Playlists containing Amazing Cats:",
+        "cats",
+        "Deleted playlist: cats",
+        "No playlists contain Amazing Cats",
+    ]
+
+
+def test_smart_playlist_survives_a_restart(tmp_path, capfd):
+    player = VideoPlayer(playlist_store=PlaylistStore(tmp_path))
+    player.create_smart_playlist("Cats", ["tag:#cat"])
+    player.close()
+    store = PlaylistStore(tmp_path)
+    store.compact()
+    store.close()
+    capfd.readouterr()
+
+    player = VideoPlayer(playlist_store=PlaylistStore(tmp_path))
+    player.show_playlist("cats")
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Showing playlist: cats",
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Another Cat Video (another_cat_video_id) [#cat #animal]",
+    ]
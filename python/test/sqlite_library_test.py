@@ -0,0 +1,95 @@
+import random
+from unittest import mock
+
+from src.search_query import parse_search_query
+from src.sqlite_library import SqliteVideoLibrary
+from src.video_library import DEFAULT_CATALOG
+from src.video_player import VideoPlayer
+
+
+def _ids(videos):
+    return sorted(video.video_id for video in videos)
+
+
+def test_sqlite_library_imports_catalog():
+    library = SqliteVideoLibrary()
+
+    assert len(library) == 5
+    video = library.get_video("amazing_cats_video_id")
+    assert video.title == "Amazing Cats"
+    assert set(video.tags) == {"#cat", "#animal"}
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("does_not_exist") is None
+
+
+def test_sqlite_library_searches():
+    library = SqliteVideoLibrary()
+
+    assert _ids(library.search_titles("CAT")) == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert _ids(library.search_titles("g")) == [
+        "amazing_cats_video_id", "funny_dogs_video_id",
+        "life_at_google_video_id", "nothing_video_id"]
+    assert _ids(library.get_videos_with_tag("#Animal")) == [
+        "amazing_cats_video_id", "another_cat_video_id", "funny_dogs_video_id"]
+
+
+def test_title_search_folds_case_like_python(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text(
+        "Die Straße | strasse_video_id |\nSTRASSE | caps_video_id |\n",
+        encoding="utf-8")
+    library = SqliteVideoLibrary(catalog)
+
+    for term in ("STRASSE", "straße", "ße", "Strass"):
+        assert _ids(library.search_titles(term)) == [
+            "caps_video_id", "strasse_video_id"]
+    assert _ids(library.query_videos(parse_search_query(["title:sse"]))) == [
+        "caps_video_id", "strasse_video_id"]
+
+
+def test_sqlite_library_flags_persist(tmp_path):
+    database = tmp_path / "videos.db"
+    library = SqliteVideoLibrary(database=database)
+    video = library.flag_video("amazing_cats_video_id", "dont_like_cats")
+    assert video.flagged
+    assert _ids(library.search_titles("cat")) == ["another_cat_video_id"]
+    library.close()
+
+    # Reopening the database keeps the flag and does not import again.
+    reopened = SqliteVideoLibrary(DEFAULT_CATALOG, database=database)
+    assert len(reopened) == 5
+    assert reopened.get_video("amazing_cats_video_id").flagged_reason == \
+        "dont_like_cats"
+    assert _ids(reopened.get_videos_with_tag("#cat")) == ["another_cat_video_id"]
+    reopened.allow_video("amazing_cats_video_id")
+    assert not reopened.get_video("amazing_cats_video_id").flagged
+
+
+@mock.patch("src.video_player.input", lambda *args: "No")
+def test_player_on_sqlite_backend(capfd):
+    player = VideoPlayer(backend="sqlite")
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.flag_video("amazing_cats_video_id", "dont_like_cats")
+    player.show_playlist("my_playlist")
+    player.search_videos_tag("#cat")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert ("Amazing Cats (amazing_cats_video_id) [#cat #animal] - FLAGGED "
+            "(reason: dont_like_cats)") in lines[4]
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" in \
+        lines[6]
+
+
+def test_sqlite_random_video_skips_flagged_videos():
+    library = SqliteVideoLibrary()
+    for video_id in ("funny_dogs_video_id", "amazing_cats_video_id",
+                     "another_cat_video_id", "life_at_google_video_id"):
+        library.flag_video(video_id)
+    rng = random.Random(0)
+
+    assert {library.random_video(rng).video_id for _ in range(20)} == {
+        "nothing_video_id"}
+    library.flag_video("nothing_video_id")
+    assert library.random_video(rng) is None
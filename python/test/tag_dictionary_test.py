@@ -0,0 +1,25 @@
+from src.tag_dictionary import TagDictionary
+from src.video_library import VideoLibrary
+
+
+def test_intern_numbers_tags_and_folded_forms():
+    tags = TagDictionary()
+    cat = tags.intern("#cat")
+    upper_cat = tags.intern("#CAT")
+    dog = tags.intern("#dog")
+
+    assert tags.intern("#cat") == cat
+    assert len({cat, upper_cat, dog}) == 3
+    assert tags.folded_id(cat) == tags.folded_id(upper_cat)
+    assert tags.folded_id(cat) != tags.folded_id(dog)
+    assert tags.lookup_folded("#Cat") == tags.folded_id(cat)
+    assert tags.folded_name(tags.folded_id(upper_cat)) == "#cat"
+    assert tags.lookup_folded("#bird") is None
+
+
+def test_videos_share_tag_instances():
+    library = VideoLibrary()
+    cats = library.get_video("amazing_cats_video_id")
+    dogs = library.get_video("funny_dogs_video_id")
+
+    assert cats.tags[1] is dogs.tags[1]
@@ -0,0 +1,62 @@
+from src.video_catalog import CompiledCatalog, compile_catalog
+from src.video_library import DEFAULT_CATALOG, VideoLibrary
+
+
+def _compiled_library(tmp_path):
+    target = tmp_path / "videos.ytc"
+    compile_catalog(DEFAULT_CATALOG, target)
+    return VideoLibrary(target)
+
+
+def test_compiled_catalog_round_trips_records(tmp_path):
+    target = tmp_path / "videos.ytc"
+    assert compile_catalog(DEFAULT_CATALOG, target) == 5
+
+    catalog = CompiledCatalog(target)
+    assert len(catalog) == 5
+    assert catalog.record(catalog.find("amazing_cats_video_id")) == (
+        "Amazing Cats", "amazing_cats_video_id", ("#cat", "#animal"))
+    assert catalog.record(catalog.find("nothing_video_id")) == (
+        "Video about nothing", "nothing_video_id", ())
+    assert catalog.find("does_not_exist") is None
+    catalog.close()
+
+
+def test_compiled_library_matches_text_library(tmp_path):
+    compiled = _compiled_library(tmp_path)
+    text = VideoLibrary()
+
+    assert sorted(compiled.get_all_videos()) == sorted(text.get_all_videos())
+    assert compiled.get_video("funny_dogs_video_id").tags == ("#dog", "#animal")
+    assert compiled.get_video("does_not_exist") is None
+
+
+def test_compiled_library_searches_and_flags(tmp_path):
+    library = _compiled_library(tmp_path)
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+
+    assert [video.video_id for video in library.search_titles("cat")] == [
+        "another_cat_video_id"]
+    assert [video.video_id for video in library.get_videos_with_tag("#CAT")] \
+        == ["another_cat_video_id"]
+    assert library.get_video("amazing_cats_video_id").flagged
+
+
+def test_parallel_loader_matches_serial_loader(tmp_path):
+    source = tmp_path / "videos.txt"
+    lines = DEFAULT_CATALOG.read_text().splitlines()
+    # Repeat the catalog with fresh ids, and one repeated id, so that
+    # every chunk holds several lines.
+    source.write_text("\n".join(
+        [line.replace("_video_id", "_{}_video_id".format(copy))
+         for copy in range(20) for line in lines]
+        + [lines[0].replace("_video_id", "_0_video_id")]) + "\n")
+
+    serial = VideoLibrary(source)
+    parallel = VideoLibrary(source, workers=3)
+
+    assert [(video.title, video.video_id, video.tags)
+            for video in parallel.get_all_videos()] == \
+        [(video.title, video.video_id, video.tags)
+         for video in serial.get_all_videos()]
+    assert len(parallel.get_all_videos()) == 100
@@ -0,0 +1,67 @@
+import pytest
+
+from src.video_library import VideoLibrary
+from src.tag_dictionary import TagDictionary
+from src.video_store import ColumnarVideoStore, EagerVideoStore, VideoStore
+
+
+def _as_tuples(videos):
+    return sorted((video.title, video.video_id, tuple(video.tags),
+                   video.flagged, video.flagged_reason) for video in videos)
+
+
+def test_columnar_store_matches_object_store():
+    columnar = VideoLibrary(storage="columnar")
+    objects = VideoLibrary()
+
+    assert _as_tuples(columnar.get_all_videos()) == \
+        _as_tuples(objects.get_all_videos())
+    assert columnar.get_video("nothing_video_id").tags == ()
+    assert columnar.get_video("does_not_exist") is None
+
+
+def test_columnar_store_keeps_flag_state():
+    library = VideoLibrary(storage="columnar")
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+
+    video = library.get_video("amazing_cats_video_id")
+    assert video.flagged
+    assert video.flagged_reason == "dont_like_cats"
+    assert [video.video_id for video in library.search_titles("cat")] == [
+        "another_cat_video_id"]
+
+    library.allow_video("amazing_cats_video_id")
+    assert not library.get_video("amazing_cats_video_id").flagged
+    assert library.get_video("amazing_cats_video_id").flagged_reason == ""
+
+
+@pytest.mark.parametrize("engine", [EagerVideoStore, ColumnarVideoStore])
+def test_repeated_id_replaces_the_entry_in_place(engine):
+    store = engine([
+        ("First", "a", ["#x"]),
+        ("Second", "b", []),
+        ("Replaced", "a", ["#y", "#z"]),
+        ("Third", "c", ["#x"]),
+    ], TagDictionary())
+
+    assert len(store) == 3
+    assert [record[1:] for record in store.records()] == [
+        ("Replaced", "a", ("#y", "#z")),
+        ("Second", "b", ()),
+        ("Third", "c", ("#x",)),
+    ]
+    assert [store.row_of(video_id) for video_id in "abcd"] == [0, 1, 2, None]
+
+
+def test_unknown_storage_engine():
+    with pytest.raises(ValueError):
+        VideoLibrary(storage="punch_cards")
+
+
+def test_store_without_row_access_cannot_be_built():
+    class SizedOnly(VideoStore):
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        SizedOnly()
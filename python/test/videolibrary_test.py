@@ -1,3 +1,5 @@
+import random
+
 from src.video_library import VideoLibrary
 
 
@@ -24,3 +26,83 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_tag_lookup_is_case_insensitive():
+    library = VideoLibrary()
+    videos = library.get_videos_with_tag("#CAT")
+
+    assert {video.video_id for video in videos} == {
+        "amazing_cats_video_id", "another_cat_video_id"}
+
+
+def test_tag_index_follows_flag_and_allow():
+    library = VideoLibrary()
+    library.flag_video("amazing_cats_video_id", "dont_like_cats")
+    assert [video.video_id for video in library.get_videos_with_tag("#cat")] \
+        == ["another_cat_video_id"]
+
+    library.allow_video("amazing_cats_video_id")
+    assert {video.video_id for video in library.get_videos_with_tag("#cat")} \
+        == {"amazing_cats_video_id", "another_cat_video_id"}
+
+
+def test_search_titles_matches_substrings_case_insensitively():
+    library = VideoLibrary()
+
+    assert {video.video_id for video in library.search_titles("CAT")} == {
+        "amazing_cats_video_id", "another_cat_video_id"}
+    assert [video.video_id for video in library.search_titles("at goo")] == [
+        "life_at_google_video_id"]
+    assert library.search_titles("cats video") == []
+    # "ats" and "vid" are both indexed, but never in the same title
+    library._ensure_indexes()
+    assert list(library._title_candidates("cats video")) == []
+
+
+def test_search_titles_short_terms_and_flagged_videos():
+    library = VideoLibrary()
+    library.flag_video("funny_dogs_video_id")
+
+    assert {video.video_id for video in library.search_titles("g")} == {
+        "amazing_cats_video_id", "life_at_google_video_id",
+        "nothing_video_id"}
+
+
+def test_results_come_out_in_title_order():
+    library = VideoLibrary()
+
+    assert [video.title for video in library.get_all_videos()] == [
+        "Amazing Cats", "Another Cat Video", "Funny Dogs", "Life at Google",
+        "Video about nothing"]
+    assert [video.title for video in library.search_titles("o")] == [
+        "Another Cat Video", "Funny Dogs", "Life at Google",
+        "Video about nothing"]
+
+
+def test_tag_results_keep_title_order_across_flag_and_allow():
+    library = VideoLibrary()
+    library.flag_video("amazing_cats_video_id")
+    library.flag_video("funny_dogs_video_id")
+    library.allow_video("funny_dogs_video_id")
+    library.allow_video("amazing_cats_video_id")
+
+    assert [video.title for video in library.get_videos_with_tag("#animal")] \
+        == ["Amazing Cats", "Another Cat Video", "Funny Dogs"]
+
+
+def test_random_video_skips_flagged_videos():
+    library = VideoLibrary()
+    for video_id in ("funny_dogs_video_id", "amazing_cats_video_id",
+                     "another_cat_video_id", "life_at_google_video_id"):
+        library.flag_video(video_id)
+    rng = random.Random(0)
+
+    assert {library.random_video(rng).video_id for _ in range(20)} == {
+        "nothing_video_id"}
+
+    library.flag_video("nothing_video_id")
+    assert library.random_video(rng) is None
+
+    library.allow_video("funny_dogs_video_id")
+    assert library.random_video(rng).video_id == "funny_dogs_video_id"